@@ -0,0 +1,274 @@
+"""
+Streaming analytics over recorded games
+
+Reads the game record shards written by ``records.py`` and reports:
+
+* openings      -- how often each first move is played and how it scores
+* first-move    -- X and O win rates and draws, per board
+* over-time     -- results of each pairing of players per day or month
+* length        -- average game length in moves, per board
+
+A pipeline is a chain of generators: a source yields GameRecords, ``where``
+stages drop records, and ``aggregate`` feeds each record to the reports,
+which group by a key and fold the records into small aggregates.  Nothing
+holds more than one record at a time, so memory depends on the number of
+groups, not on the size of the history.  Shards are scanned in parallel,
+one per worker, and their partial aggregates merged.  Custom reports
+used with several workers must be built from module-level functions so
+they can be sent to the worker processes.
+
+    python analytics.py --dir games.d --workers 8 --since 2026-01-01 --player hard
+"""
+
+import argparse
+import calendar
+import os
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from records import GAMES_DIR, INDEX_SUFFIX, iter_shard
+
+Report = namedtuple("Report", ["name", "key", "aggregate"])
+
+RESULTS = ("X", "O", "draw")
+
+PERIOD_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+
+
+class ResultTally:
+    """Counts of X wins, O wins and draws"""
+
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, record):
+        self.counts[record.result] += 1
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+
+    @property
+    def games(self):
+        return sum(self.counts.values())
+
+    def percent(self, result):
+        games = self.games
+        return self.counts[result] / games * 100 if games else 0.0
+
+
+class LengthMean:
+    """Average number of moves"""
+
+    __slots__ = ("games", "moves")
+
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+
+    def add(self, record):
+        self.games += 1
+        self.moves += len(record.moves)
+
+    def merge(self, other):
+        self.games += other.games
+        self.moves += other.moves
+
+    @property
+    def mean(self):
+        return self.moves / self.games if self.games else 0.0
+
+
+class RecordFilter:
+    """Predicate on GameRecords; every condition given must hold"""
+
+    def __init__(self, since=None, until=None, player=None, rows=None, cols=None, k=None):
+        # since and until are epoch seconds, until exclusive
+        self.since = since
+        self.until = until
+        self.player = player
+        self.shape = (rows, cols, k)
+
+    def __call__(self, record):
+        if self.since is not None and record.timestamp < self.since:
+            return False
+        if self.until is not None and record.timestamp >= self.until:
+            return False
+        if self.player is not None and self.player not in (record.x_player, record.o_player):
+            return False
+        for wanted, actual in zip(self.shape, (record.rows, record.cols, record.k)):
+            if wanted is not None and wanted != actual:
+                return False
+        return True
+
+
+def board_shape(record):
+    return f"{record.rows}x{record.cols} k={record.k}"
+
+
+def opening_key(record):
+    if not record.moves:
+        return None
+    return board_shape(record), record.moves[0] + 1
+
+
+class PeriodKey:
+    """Groups by pairing of players and calendar period (UTC)"""
+
+    def __init__(self, period="day"):
+        self.format = PERIOD_FORMATS[period]
+
+    def __call__(self, record):
+        return (f"{record.x_player} vs {record.o_player}",
+                time.strftime(self.format, time.gmtime(record.timestamp)))
+
+
+def default_reports(period="day"):
+    return [
+        Report("openings", opening_key, ResultTally),
+        Report("first-move", board_shape, ResultTally),
+        Report("over-time", PeriodKey(period), ResultTally),
+        Report("length", board_shape, LengthMean),
+    ]
+
+
+# Pipeline stages
+
+def game_records(directory=GAMES_DIR):
+    """Yield every recorded game in a games directory, shard by shard"""
+    for base in shard_paths(directory):
+        yield from iter_shard(base)
+
+
+def shard_paths(directory=GAMES_DIR):
+    try:
+        names = sorted(name[:-len(INDEX_SUFFIX)] for name in os.listdir(directory)
+                       if name.endswith(INDEX_SUFFIX))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in names]
+
+
+def where(records, predicate):
+    for record in records:
+        if predicate(record):
+            yield record
+
+
+def aggregate(records, reports):
+    """Fold a stream of records into {report name: {key: aggregate}}"""
+    results = {report.name: {} for report in reports}
+    for record in records:
+        for report in reports:
+            key = report.key(record)
+            if key is None:
+                continue
+            groups = results[report.name]
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = report.aggregate()
+            group.add(record)
+    return results
+
+
+def merge_results(total, part):
+    for name, groups in part.items():
+        merged = total.setdefault(name, {})
+        for key, group in groups.items():
+            if key in merged:
+                merged[key].merge(group)
+            else:
+                merged[key] = group
+    return total
+
+
+def scan_shard(base, reports, predicate=None):
+    """Run the reports over one shard"""
+    records = iter_shard(base)
+    if predicate is not None:
+        records = where(records, predicate)
+    return aggregate(records, reports)
+
+
+def run_reports(directory=GAMES_DIR, reports=None, predicate=None, workers=None):
+    """Run reports over every shard in directory, in parallel across shards"""
+    reports = default_reports() if reports is None else reports
+    shards = shard_paths(directory)
+    workers = min(workers or os.cpu_count() or 1, max(len(shards), 1))
+    total = {report.name: {} for report in reports}
+    if workers == 1:
+        for base in shards:
+            merge_results(total, scan_shard(base, reports, predicate))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(scan_shard, base, reports, predicate) for base in shards]
+        for future in as_completed(futures):
+            merge_results(total, future.result())
+    return total
+
+
+def format_results(results, top=10):
+    """Yield report lines"""
+    if "openings" in results:
+        yield "Openings"
+        by_shape = {}
+        for (shape, position), tally in results["openings"].items():
+            by_shape.setdefault(shape, []).append((position, tally))
+        for shape, openings in sorted(by_shape.items()):
+            games = sum(tally.games for _, tally in openings)
+            yield f"  {shape}: {games} games"
+            openings.sort(key=lambda opening: opening[1].games, reverse=True)
+            for position, tally in openings[:top]:
+                yield (f"    {position:>4} {tally.games / games * 100:6.1f}% played   "
+                       + _result_columns(tally))
+    if "first-move" in results:
+        yield "First-move advantage"
+        for shape, tally in sorted(results["first-move"].items()):
+            yield f"  {shape}: {tally.games:>10} games   " + _result_columns(tally)
+    if "over-time" in results:
+        yield "Results over time"
+        for (pairing, period), tally in sorted(results["over-time"].items()):
+            yield f"  {pairing:<24} {period}  {tally.games:>8} games   " + _result_columns(tally)
+    if "length" in results:
+        yield "Game length"
+        for shape, mean in sorted(results["length"].items()):
+            yield f"  {shape}: {mean.mean:.2f} moves on average over {mean.games} games"
+
+
+def _result_columns(tally):
+    return "   ".join(f"{result} {tally.percent(result):5.1f}%" for result in RESULTS)
+
+
+def _parse_date(text):
+    return calendar.timegm(time.strptime(text, "%Y-%m-%d"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report on recorded games")
+    parser.add_argument("--dir", default=GAMES_DIR, help="games directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--report", action="append", choices=("openings", "first-move", "over-time", "length"),
+                        help="report to run (repeatable; default: all)")
+    parser.add_argument("--period", choices=sorted(PERIOD_FORMATS), default="day",
+                        help="period for the over-time report")
+    parser.add_argument("--since", type=_parse_date, default=None, help="first day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--until", type=_parse_date, default=None, help="day after the last (YYYY-MM-DD, UTC)")
+    parser.add_argument("--player", default=None, help="only games with this player kind on either side")
+    parser.add_argument("--rows", type=int, default=None, help="only boards with this many rows")
+    parser.add_argument("--cols", type=int, default=None, help="only boards with this many columns")
+    parser.add_argument("-k", type=int, default=None, help="only boards with this k")
+    parser.add_argument("--top", type=int, default=10, help="openings listed per board")
+    args = parser.parse_args(argv)
+
+    reports = [report for report in default_reports(args.period)
+               if not args.report or report.name in args.report]
+    predicate = RecordFilter(args.since, args.until, args.player, args.rows, args.cols, args.k)
+    results = run_reports(args.dir, reports, predicate, args.workers)
+    for line in format_results(results, args.top):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Streaming batch position analysis
+
+Reads positions, one per line, and writes the best move and value of each
+one back in input order:
+
+    input:   <cells> [<side to move>]
+    output:  <cells> <side> <status> <best move> <value> [<plies>]
+
+``cells`` lists the board row by row using X, O and . (or - or _) for
+empty cells, optionally with / between rows ("X.O/.X./..O").  Without
+slashes the board is taken to be square.  The side to move defaults to X
+when both players have the same number of marks and O otherwise.
+
+``status`` is in-progress, x-wins, o-wins or draw.  ``value`` is win,
+loss or draw for the side to move.  For decisive values, ``plies`` counts
+the moves until the game ends with best play.  3x3 boards and boards
+covered by a --tablebase are solved exactly; on other boards a
+time-limited alpha-beta search may return ``estimate`` with a heuristic
+score instead.
+
+Lines are analyzed in chunks across a process pool.  Only a bounded
+window of chunks is in flight at once, so memory use stays flat however
+long the input is.
+
+    python analyze.py positions.txt -o results.txt --workers 8
+    cat positions.txt | python analyze.py - > results.txt
+"""
+
+import argparse
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import strategies
+import tictactoe
+from bitboard import best_move, board_masks
+from mnk import EMPTY, MNKBoard
+from search import MATE_THRESHOLD, WIN_SCORE, AlphaBetaSearch
+from tablebase import OUTCOME_NAMES, side_to_move
+
+EMPTY_CHARS = ".-_"
+
+# Search budget for positions without an exact solver
+SEARCH_TIME_BUDGET = 0.5
+
+
+def parse_position(line):
+    """Parse '<cells> [<side>]' into (board, side); raise ValueError if malformed"""
+    fields = line.split()
+    if not fields or len(fields) > 2:
+        raise ValueError("expected '<cells> [<side>]'")
+    if "/" in fields[0]:
+        rows = fields[0].split("/")
+    else:
+        size = math.isqrt(len(fields[0]))
+        if size * size != len(fields[0]):
+            raise ValueError("board is not square; separate rows with '/'")
+        rows = [fields[0][row * size:(row + 1) * size] for row in range(size)]
+    if len({len(row) for row in rows}) != 1 or not rows[0]:
+        raise ValueError("rows have different lengths")
+    board = []
+    for row in rows:
+        cells = []
+        for char in row.upper():
+            if char in "XO":
+                cells.append(char)
+            elif char in EMPTY_CHARS:
+                cells.append(EMPTY)
+            else:
+                raise ValueError(f"unexpected cell {char!r}")
+        board.append(cells)
+    cells = [cell for row in board for cell in row]
+    side = fields[1].upper() if len(fields) == 2 else side_to_move(cells)
+    if side not in ("X", "O"):
+        raise ValueError(f"unexpected side to move {fields[1]!r}")
+    return board, side
+
+
+def analyze_position(board, side, k=None, time_budget=SEARCH_TIME_BUDGET):
+    """Return (status, best_position, value, plies) for side to move
+
+    best_position is 1-based or None, plies is None unless the value is a
+    proven win or loss.
+    """
+    if tictactoe.check_winner(board, "X", k):
+        return "x-wins", None, "loss" if side == "X" else "win", 0
+    if tictactoe.check_winner(board, "O", k):
+        return "o-wins", None, "loss" if side == "O" else "win", 0
+    if tictactoe.is_draw(board):
+        return "draw", None, "draw", None
+
+    rows, cols = len(board), len(board[0])
+    tablebase = strategies.HARD_AI_TABLEBASE
+    cells = [cell for row in board for cell in row]
+    if (tablebase is not None and tablebase.matches(rows, cols, min(rows, cols) if k is None else k)
+            and side_to_move(cells) == side):
+        outcome, index = tablebase.probe(cells)
+        if index is not None:
+            return "in-progress", index + 1, OUTCOME_NAMES[outcome], None
+
+    if strategies.is_classic_board(board, k):
+        x_mask, o_mask = board_masks(board)
+        me, opp = (x_mask, o_mask) if side == "X" else (o_mask, x_mask)
+        position, score = best_move(me, opp, strategies.HARD_AI_TABLE)
+        if score == 0:
+            return "in-progress", position, "draw", None
+        # A score of 10 is a win on this move; each extra ply costs one point
+        return "in-progress", position, "win" if score > 0 else "loss", 11 - abs(score)
+
+    result = AlphaBetaSearch(time_budget).search(MNKBoard.from_list(board, k), side)
+    position = None if result.move is None else result.move + 1
+    if abs(result.score) >= MATE_THRESHOLD:
+        value = "win" if result.score > 0 else "loss"
+        return "in-progress", position, value, WIN_SCORE - abs(result.score)
+    if result.completed:
+        return "in-progress", position, "draw", None
+    return "in-progress", position, f"estimate:{result.score}", None
+
+
+def analyze_line(line, k=None, time_budget=SEARCH_TIME_BUDGET):
+    """Analyze one input line and return the output line (without newline)"""
+    line = line.strip()
+    try:
+        board, side = parse_position(line)
+        status, position, value, plies = analyze_position(board, side, k, time_budget)
+    except ValueError as e:
+        return f"{line} error: {e}"
+    cells = "/".join("".join(cell if cell != EMPTY else "." for cell in row) for row in board)
+    fields = [cells, side, status, "-" if position is None else str(position), value]
+    if plies is not None:
+        fields.append(str(plies))
+    return " ".join(fields)
+
+
+def analyze_chunk(lines, k=None, time_budget=SEARCH_TIME_BUDGET):
+    return [analyze_line(line, k, time_budget) for line in lines]
+
+
+def _init_worker(tablebase_path):
+    if tablebase_path:
+        strategies.load_tablebase(tablebase_path)
+
+
+def _chunks(lines, chunk_size):
+    lines = (line for line in lines if line.strip())
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def analyze_stream(lines, workers=None, chunk_size=1000, window=None, k=None,
+                   time_budget=SEARCH_TIME_BUDGET, tablebase_path=None):
+    """Analyze an iterable of lines and yield output lines in input order
+
+    At most ``window`` chunks (default: 4 per worker) are queued or running
+    at any time; reading pauses until the oldest chunk has been written.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(tablebase_path)
+        for chunk in _chunks(lines, chunk_size):
+            yield from analyze_chunk(chunk, k, time_budget)
+        return
+    window = window or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tablebase_path,)) as pool:
+        in_flight = deque()
+        for chunk in _chunks(lines, chunk_size):
+            if len(in_flight) >= window:
+                yield from in_flight.popleft().result()
+            in_flight.append(pool.submit(analyze_chunk, chunk, k, time_budget))
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze Tic Tac Toe positions in bulk")
+    parser.add_argument("input", nargs="?", default="-", help="positions file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="results file, or - for stdout")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="lines per worker task")
+    parser.add_argument("--window", type=int, default=None, help="chunks in flight (default: 4 per worker)")
+    parser.add_argument("-k", type=int, default=None, help="marks in a row needed to win")
+    parser.add_argument("--time-budget", type=float, default=SEARCH_TIME_BUDGET,
+                        help="search seconds per position on boards without an exact solver")
+    parser.add_argument("--tablebase", help="tablebase file for exact results on its board")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for line in analyze_stream(source, args.workers, args.chunk_size, args.window, args.k,
+                                   args.time_budget, args.tablebase):
+            sink.write(line + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Vectorized position evaluation with NumPy
+
+Classifies whole batches of positions at once for offline analysis.
+Boards are an (N, rows * cols) int8 array in row-major cell order with
+X_CELL, O_CELL or EMPTY_CELL in each cell; an (N, 9) array is a batch of
+classic 3x3 boards.  Results agree exactly with the scalar
+``check_winner``, ``is_draw`` and ``get_available_positions`` functions.
+
+NumPy is only needed for this module; the games themselves do not use it.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from mnk import get_geometry
+
+EMPTY_CELL = 0
+X_CELL = 1
+O_CELL = -1
+
+STATUS_IN_PROGRESS = 0
+STATUS_X_WIN = 1
+STATUS_O_WIN = 2
+STATUS_DRAW = 3
+
+# Boards are processed in chunks so the (chunk, lines, k) gather stays small
+CHUNK_SIZE = 1 << 15
+
+BatchEvaluation = namedtuple(
+    "BatchEvaluation", ["x_wins", "o_wins", "full", "status", "terminal", "legal"]
+)
+
+
+@lru_cache(maxsize=None)
+def line_indices(rows=3, cols=3, k=None):
+    """(lines, k) array of the cell indices of every winning line"""
+    geometry = get_geometry(rows, cols, min(rows, cols) if k is None else k)
+    return np.array(geometry.lines, dtype=np.intp).reshape(-1, geometry.k)
+
+
+def boards_to_array(boards):
+    """Convert list-of-lists boards to an (N, rows * cols) int8 array"""
+    codes = {"X": X_CELL, "O": O_CELL}
+    return np.array(
+        [[codes.get(cell, EMPTY_CELL) for row in board for cell in row] for board in boards],
+        dtype=np.int8,
+    )
+
+
+def evaluate_batch(boards, rows=3, cols=3, k=None):
+    """Evaluate a batch of boards
+
+    Returns a BatchEvaluation of per-board arrays:
+
+    * x_wins, o_wins -- bool, like check_winner(board, "X"/"O")
+    * full           -- bool, like is_draw(board) (every cell taken)
+    * status         -- int8 STATUS_* code; a completed line takes
+                        precedence over a full board, X over O
+    * terminal       -- bool, status != STATUS_IN_PROGRESS
+    * legal          -- (N, rows * cols) bool mask of empty cells, like
+                        get_available_positions
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.ndim != 2 or boards.shape[1] != rows * cols:
+        raise ValueError(f"Expected an (N, {rows * cols}) array, got shape {boards.shape}")
+    lines = line_indices(rows, cols, k)
+    target = lines.shape[1]
+
+    count = boards.shape[0]
+    x_wins = np.empty(count, dtype=bool)
+    o_wins = np.empty(count, dtype=bool)
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = boards[start:start + CHUNK_SIZE]
+        # Sum each line: a line of k X's sums to k and of k O's to -k
+        sums = chunk[:, lines].sum(axis=2, dtype=np.int16)
+        x_wins[start:start + CHUNK_SIZE] = (sums == target * X_CELL).any(axis=1)
+        o_wins[start:start + CHUNK_SIZE] = (sums == target * O_CELL).any(axis=1)
+
+    legal = boards == EMPTY_CELL
+    full = ~legal.any(axis=1)
+    status = np.full(count, STATUS_IN_PROGRESS, dtype=np.int8)
+    status[full] = STATUS_DRAW
+    status[o_wins] = STATUS_O_WIN
+    status[x_wins] = STATUS_X_WIN
+    return BatchEvaluation(x_wins, o_wins, full, status, status != STATUS_IN_PROGRESS, legal)
@@ -0,0 +1,226 @@
+"""
+Benchmarks for the engine's hot paths
+
+Measures per-call latency of the rule functions, time to move for every
+AI difficulty from fixed positions, search speed (nodes or playouts per
+second) and full-game throughput with no sleeps.  Each timing is the
+best of several repeats, which is the least noisy estimate on a busy
+machine.
+
+Results are written as JSON.  With --save they become the baseline; later
+runs compare against it and exit with status 1 when any benchmark is
+slower than the baseline by more than --threshold (default 25%).
+
+    python bench.py --save             # record a baseline
+    python bench.py                    # compare against it
+    python bench.py --only hard -o run.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+
+import tictactoe
+from mnk import MNKBoard
+from search import AlphaBetaSearch
+from simulate import run_chunk
+
+BASELINE_PATH = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+# Repeats per benchmark; the fastest is reported
+REPEAT = 5
+
+# Fixed positions, rows separated by /, with . for empty cells
+OPENING = ".../.../..."
+MIDGAME = "X.O/.X./..O"
+BLOCK = "XX./.O./..."
+LARGE_MIDGAME = "......./......./..XO.../...X.../..O..../......./......."
+GOMOKU_FULL = "/".join(
+    "".join("XO"[(row // 2 + col) % 2] for col in range(15)) for row in range(15)
+)
+
+
+def parse_board(text):
+    return [[" " if cell == "." else cell for cell in row] for row in text.split("/")]
+
+
+class Benchmark:
+    """A named measurement; unit says what value means"""
+
+    def __init__(self, name, function, unit="us", higher_is_better=False):
+        self.name = name
+        self.function = function
+        self.unit = unit
+        self.higher_is_better = higher_is_better
+
+    def run(self):
+        return self.function()
+
+
+def per_call(function, repeat=REPEAT):
+    """Best time per call in microseconds"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def best_of(measure, repeat=REPEAT):
+    return max(measure() for _ in range(repeat))
+
+
+def _hard_cold(board, player):
+    def move():
+        tictactoe.HARD_AI_TABLE.clear()
+        tictactoe.ai_hard_move(board, player)
+    return move
+
+
+def _alpha_beta_rate(board_text, k, depth):
+    board = MNKBoard.from_list(parse_board(board_text), k)
+
+    def measure():
+        result = AlphaBetaSearch(time_budget=None, max_depth=depth).search(board, "X")
+        return result.nodes / result.elapsed
+    return lambda: best_of(measure, 3)
+
+
+def _mcts_move(board, player, iterations):
+    def move():
+        tictactoe.MCTS_PLAYER.reset()
+        tictactoe.ai_mcts_move(board, player, time_budget=None, iterations=iterations)
+    return move
+
+
+def _mcts_rate(board_text, iterations):
+    def measure():
+        tictactoe.MCTS_PLAYER.reset()
+        start = time.perf_counter()
+        tictactoe.ai_mcts_move(parse_board(board_text), "X", time_budget=None,
+                               iterations=iterations)
+        return iterations / (time.perf_counter() - start)
+    return lambda: best_of(measure, 3)
+
+
+def _games_per_second(x_difficulty, o_difficulty, games):
+    def measure():
+        start = time.perf_counter()
+        run_chunk(x_difficulty, o_difficulty, games, seed=0)
+        return games / (time.perf_counter() - start)
+    return lambda: best_of(measure, 3)
+
+
+def benchmarks():
+    opening, midgame, block = parse_board(OPENING), parse_board(MIDGAME), parse_board(BLOCK)
+    gomoku = parse_board(GOMOKU_FULL)
+    random.seed(0)
+    return [
+        # Rule functions
+        Benchmark("rules.check_winner.3x3", lambda: per_call(
+            lambda: tictactoe.check_winner(midgame, "X"))),
+        Benchmark("rules.check_winner.15x15", lambda: per_call(
+            lambda: tictactoe.check_winner(gomoku, "X", 5))),
+        Benchmark("rules.is_draw.3x3", lambda: per_call(lambda: tictactoe.is_draw(midgame))),
+        Benchmark("rules.available.3x3", lambda: per_call(
+            lambda: tictactoe.get_available_positions(midgame))),
+        # Time to move
+        Benchmark("move.easy", lambda: per_call(lambda: tictactoe.ai_easy_move(midgame, "X"))),
+        Benchmark("move.medium", lambda: per_call(lambda: tictactoe.ai_medium_move(block, "X"))),
+        Benchmark("move.hard.opening.cold", lambda: per_call(_hard_cold(opening, "X"))),
+        Benchmark("move.hard.midgame.cold", lambda: per_call(_hard_cold(midgame, "X"))),
+        Benchmark("move.hard.opening.warm", lambda: per_call(
+            lambda: tictactoe.ai_hard_move(opening, "X"))),
+        Benchmark("move.mcts.500", lambda: per_call(_mcts_move(midgame, "X", 500), 3)),
+        # Search speed
+        Benchmark("search.alphabeta.7x7.nodes", _alpha_beta_rate(LARGE_MIDGAME, 4, 3),
+                  "nodes/s", higher_is_better=True),
+        Benchmark("search.mcts.3x3.playouts", _mcts_rate(OPENING, 2000),
+                  "playouts/s", higher_is_better=True),
+        # Full games, no sleeps
+        Benchmark("games.easy-vs-medium", _games_per_second("easy", "medium", 2000),
+                  "games/s", higher_is_better=True),
+        Benchmark("games.hard-vs-hard", _games_per_second("hard", "hard", 2000),
+                  "games/s", higher_is_better=True),
+    ]
+
+
+def run(only=None, log=None):
+    results = {}
+    for benchmark in benchmarks():
+        if only and not any(pattern in benchmark.name for pattern in only):
+            continue
+        value = benchmark.run()
+        results[benchmark.name] = {
+            "value": value,
+            "unit": benchmark.unit,
+            "higher_is_better": benchmark.higher_is_better,
+        }
+        if log is not None:
+            print(f"{benchmark.name:<32}{value:>14.2f} {benchmark.unit}", file=log)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "benchmarks": results,
+    }
+
+
+def compare(run_results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return [(name, slowdown)] for benchmarks slower than baseline by more than threshold
+
+    slowdown is the factor by which the run is worse: 1.3 means 30% slower.
+    """
+    regressions = []
+    for name, result in run_results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None or not previous["value"] or not result["value"]:
+            continue
+        if result["higher_is_better"]:
+            slowdown = previous["value"] / result["value"]
+        else:
+            slowdown = result["value"] / previous["value"]
+        if slowdown > 1 + threshold:
+            regressions.append((name, slowdown))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Tic Tac Toe engine")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this")
+    parser.add_argument("-o", "--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.only, log=sys.stdout)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --save to create one")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for name, slowdown in regressions:
+        print(f"REGRESSION {name}: {(slowdown - 1) * 100:.0f}% slower than baseline")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
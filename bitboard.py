@@ -0,0 +1,280 @@
+"""
+Bitboard core for 3x3 Tic Tac Toe
+
+Each player's marks are stored in a 9-bit integer mask where bit
+``row * 3 + col`` is set when that cell belongs to the player.  Win, draw
+and legal-move checks become a handful of bitwise operations and table
+lookups instead of scanning a list of lists.
+"""
+
+from collections import OrderedDict
+
+BOARD_SIZE = 3
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+FULL_MASK = (1 << CELL_COUNT) - 1
+
+# Bit for each cell, indexed by row * 3 + col
+CELL_BITS = tuple(1 << index for index in range(CELL_COUNT))
+
+
+def _line_mask(cells):
+    mask = 0
+    for row, col in cells:
+        mask |= 1 << (row * BOARD_SIZE + col)
+    return mask
+
+
+# Rows, columns and the two diagonals
+WIN_MASKS = tuple(
+    [_line_mask([(row, col) for col in range(BOARD_SIZE)]) for row in range(BOARD_SIZE)]
+    + [_line_mask([(row, col) for row in range(BOARD_SIZE)]) for col in range(BOARD_SIZE)]
+    + [_line_mask([(i, i) for i in range(BOARD_SIZE)]),
+       _line_mask([(i, BOARD_SIZE - 1 - i) for i in range(BOARD_SIZE)])]
+)
+
+# WINNING[mask] is True when the mask contains a complete line
+WINNING = tuple(
+    any(mask & line == line for line in WIN_MASKS) for mask in range(FULL_MASK + 1)
+)
+
+# MASK_POSITIONS[mask] lists the position numbers (1-9) of the set bits
+MASK_POSITIONS = tuple(
+    tuple(index + 1 for index in range(CELL_COUNT) if mask & CELL_BITS[index])
+    for mask in range(FULL_MASK + 1)
+)
+
+
+def _transform_table(transform):
+    """Build a 512-entry lookup that applies a cell permutation to a mask"""
+    table = []
+    for mask in range(FULL_MASK + 1):
+        mapped = 0
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                if mask & (1 << (row * BOARD_SIZE + col)):
+                    new_row, new_col = transform(row, col)
+                    mapped |= 1 << (new_row * BOARD_SIZE + new_col)
+        table.append(mapped)
+    return tuple(table)
+
+
+_LAST = BOARD_SIZE - 1
+
+# The 8 rotations/reflections of the square, as mask lookup tables
+SYMMETRIES = tuple(_transform_table(transform) for transform in (
+    lambda r, c: (r, c),
+    lambda r, c: (c, _LAST - r),
+    lambda r, c: (_LAST - r, _LAST - c),
+    lambda r, c: (_LAST - c, r),
+    lambda r, c: (r, _LAST - c),
+    lambda r, c: (_LAST - r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (_LAST - c, _LAST - r),
+))
+
+
+def canonical_key(me, opp):
+    """Return a key shared by all 8 symmetric images of a position
+
+    ``me`` is the mask of the side to move, so the key also encodes whose
+    turn it is.
+    """
+    return min(table[me] | (table[opp] << CELL_COUNT) for table in SYMMETRIES)
+
+
+class TranspositionTable:
+    """Bounded LRU cache of position scores keyed by canonical position"""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the cached score for key, or None"""
+        score = self.entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)  # Evict least recently used
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Return a dict with size, hit and miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Scores follow the original minimax: a win is worth 10 minus the number
+# of plies it takes, a loss the negative of that and a draw 0
+WIN_SCORE = 10
+
+
+def has_win(mask):
+    """Return True if the mask contains a complete line"""
+    return WINNING[mask]
+
+
+def board_masks(board):
+    """Convert a list-of-lists board into (x_mask, o_mask)"""
+    x_mask = o_mask = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == "X":
+                x_mask |= bit
+            elif cell == "O":
+                o_mask |= bit
+            bit <<= 1
+    return x_mask, o_mask
+
+
+class Bitboard:
+    """A 3x3 board stored as one 9-bit mask per player"""
+
+    __slots__ = ("x_mask", "o_mask")
+
+    def __init__(self, x_mask=0, o_mask=0):
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+
+    @classmethod
+    def from_list(cls, board):
+        """Build a bitboard from a list-of-lists board"""
+        return cls(*board_masks(board))
+
+    def to_list(self):
+        """Convert back to the list-of-lists representation"""
+        board = [[" " for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        for index in range(CELL_COUNT):
+            if self.x_mask & CELL_BITS[index]:
+                board[index // BOARD_SIZE][index % BOARD_SIZE] = "X"
+            elif self.o_mask & CELL_BITS[index]:
+                board[index // BOARD_SIZE][index % BOARD_SIZE] = "O"
+        return board
+
+    def mask(self, player):
+        return self.x_mask if player == "X" else self.o_mask
+
+    @property
+    def occupied(self):
+        return self.x_mask | self.o_mask
+
+    @property
+    def empty(self):
+        return FULL_MASK & ~(self.x_mask | self.o_mask)
+
+    def is_valid_move(self, position):
+        return 1 <= position <= CELL_COUNT and not self.occupied & CELL_BITS[position - 1]
+
+    def make_move(self, position, player):
+        """Place player's mark at position (1-9); return False if not allowed"""
+        if not self.is_valid_move(position):
+            return False
+        if player == "X":
+            self.x_mask |= CELL_BITS[position - 1]
+        else:
+            self.o_mask |= CELL_BITS[position - 1]
+        return True
+
+    def check_winner(self, player):
+        return WINNING[self.mask(player)]
+
+    def is_draw(self):
+        return self.occupied == FULL_MASK
+
+    def available_positions(self):
+        return list(MASK_POSITIONS[self.empty])
+
+
+def negamax(me, opp):
+    """Score a position for the side to move
+
+    ``me`` is the mask of the player to move and ``opp`` the mask of the
+    player who just moved.  Scores shrink toward zero by one per ply so
+    faster wins and slower losses are preferred, matching the original
+    depth-adjusted minimax.
+    """
+    if WINNING[opp]:
+        return -WIN_SCORE
+    occupied = me | opp
+    if occupied == FULL_MASK:
+        return 0
+    best = -WIN_SCORE - 1
+    empty = FULL_MASK & ~occupied
+    while empty:
+        bit = empty & -empty
+        empty ^= bit
+        score = -negamax(opp, me | bit)
+        if score > best:
+            best = score
+    if best > 0:
+        return best - 1
+    if best < 0:
+        return best + 1
+    return 0
+
+
+def cached_negamax(me, opp, table):
+    """Same as negamax but memoizes scores of canonical positions in table"""
+    key = canonical_key(me, opp)
+    score = table.get(key)
+    if score is not None:
+        return score
+    if WINNING[opp]:
+        score = -WIN_SCORE
+    elif me | opp == FULL_MASK:
+        score = 0
+    else:
+        best = -WIN_SCORE - 1
+        empty = FULL_MASK & ~(me | opp)
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            child = -cached_negamax(opp, me | bit, table)
+            if child > best:
+                best = child
+        score = best - 1 if best > 0 else best + 1 if best < 0 else 0
+    table.put(key, score)
+    return score
+
+
+def best_move(me, opp, table=None):
+    """Return (position, score) of the best move for the player owning ``me``
+
+    Ties are broken in favour of the lowest position number.  When a
+    TranspositionTable is given, scores are looked up and memoized there.
+    """
+    best_position = None
+    best_score = float('-inf')
+    for position in MASK_POSITIONS[FULL_MASK & ~(me | opp)]:
+        if table is None:
+            score = -negamax(opp, me | CELL_BITS[position - 1])
+        else:
+            score = -cached_negamax(opp, me | CELL_BITS[position - 1], table)
+        if score > best_score:
+            best_score = score
+            best_position = position
+    return best_position, best_score
@@ -0,0 +1,117 @@
+"""
+Headless game engine
+
+``Game`` holds the state of one game and applies the rules, with no
+printing, input or sleeping.  The terminal loop and the Tkinter GUI both
+drive it, and servers or simulators can host thousands of them in one
+process.
+"""
+
+from mnk import LineIndex, MNKBoard, other_player
+from strategies import get_strategy
+
+DRAW = "draw"
+
+
+class Game:
+    """One m,n,k game: legal moves, apply/undo, result and AI move requests
+
+    Positions are numbered 1 to rows * cols, row by row, as in the
+    terminal game.  With early_draw, the game is drawn as soon as no line
+    can be won by either player, without playing out the remaining cells.
+    """
+
+    __slots__ = ("board", "lines", "first_player", "current_player", "result", "early_draw")
+
+    def __init__(self, rows=3, cols=3, k=None, first_player="X", early_draw=True):
+        self.board = MNKBoard(rows, cols, k)
+        self.lines = LineIndex(self.board.geometry)
+        self.early_draw = early_draw
+        self.first_player = first_player
+        self.current_player = first_player
+        # None while in progress, then "X", "O" or DRAW
+        self.result = None
+
+    @property
+    def rows(self):
+        return self.board.rows
+
+    @property
+    def cols(self):
+        return self.board.cols
+
+    @property
+    def k(self):
+        return self.board.k
+
+    @property
+    def is_over(self):
+        return self.result is not None
+
+    @property
+    def winner(self):
+        """The winning player, or None for a draw or a game in progress"""
+        return self.result if self.result in ("X", "O") else None
+
+    @property
+    def moves(self):
+        """Positions played so far, in order"""
+        return [index + 1 for index in self.board.moves]
+
+    def legal_moves(self):
+        if self.result is not None:
+            return []
+        return [index + 1 for index in self.board.available_moves()]
+
+    def is_legal(self, position):
+        """True if position (an int, not a bool) is an empty cell of a game in progress"""
+        return (self.result is None and isinstance(position, int)
+                and not isinstance(position, bool) and self.board.is_valid_move(position - 1))
+
+    def apply(self, position):
+        """Play position for the side to move; return False if it is not legal"""
+        if not self.is_legal(position):
+            return False
+        player = self.current_player
+        index = position - 1
+        self.lines.play(index, player)
+        if self.board.play(index, player):
+            self.result = player
+        elif self.board.is_full() or (self.early_draw and self.lines.is_dead()):
+            self.result = DRAW
+        self.current_player = other_player(player)
+        return True
+
+    def undo(self):
+        """Take back the last move and return its position, or None"""
+        if not self.board.moves:
+            return None
+        index = self.board.undo()
+        self.lines.undo(index, other_player(self.current_player))
+        self.result = None
+        self.current_player = other_player(self.current_player)
+        return index + 1
+
+    def reset(self):
+        self.board = MNKBoard(self.board.rows, self.board.cols, self.board.k)
+        self.lines = LineIndex(self.board.geometry)
+        self.current_player = self.first_player
+        self.result = None
+
+    def cell(self, position):
+        return self.board.cells[position - 1]
+
+    def to_list(self):
+        """The board as a list of lists, as used by the tictactoe functions"""
+        return self.board.to_list()
+
+    def request_ai_move(self, strategy="hard", **options):
+        """Ask a registered strategy for the side to move's move, without playing it
+
+        Options such as time_budget, and the game's LineIndex as lines, are
+        passed to strategies that accept them.
+        """
+        if self.result is not None:
+            return None
+        return get_strategy(strategy).move(
+            self.to_list(), self.current_player, self.board.k, lines=self.lines, **options)
@@ -0,0 +1,137 @@
+"""
+Load generator for the game server
+
+Opens many client connections to a running ``server.py`` and has each one
+play games with random legal moves, then reports move latency
+percentiles:
+
+* ack   -- from sending a move until the server echoes it back
+* reply -- from sending a move until the opponent's move or the end of
+           the game arrives; against the AI this includes its search
+
+    python server.py &
+    python loadgen.py --clients 10000 --opponent ai --difficulty hard
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from engine import Game
+from server import DEFAULT_PORT, MAX_LINE, raise_open_file_limit
+
+# Connections being opened at once, so bursts stay within the listen backlog
+CONNECT_CONCURRENCY = 256
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def _read(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("server closed the connection")
+    return json.loads(line)
+
+
+async def run_client(host, port, games, join, seed, connect_limit, acks, replies, finished):
+    """Connect, play games to the end and record latencies in seconds
+
+    Each finished game is appended to finished once: against another
+    client only the X side counts it.
+    """
+    rng = random.Random(seed)
+    async with connect_limit:
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+    request = (json.dumps(join) + "\n").encode()
+    try:
+        for _ in range(games):
+            writer.write(request)
+            message = await _read(reader)
+            while message["type"] == "waiting":
+                message = await _read(reader)
+            if message["type"] != "start":
+                raise RuntimeError(f"unexpected message {message}")
+            me = message["you"]
+            game = Game(message["rows"], message["cols"], message["k"])
+            sent = None
+            while True:
+                if sent is None and game.current_player == me and not game.is_over:
+                    position = rng.choice(game.legal_moves())
+                    writer.write(f'{{"type":"move","position":{position}}}\n'.encode())
+                    sent = time.perf_counter()
+                message = await _read(reader)
+                now = time.perf_counter()
+                if message["type"] == "move":
+                    game.apply(message["position"])
+                    if message["player"] == me:
+                        acks.append(now - sent)
+                        continue
+                if sent is not None and message["type"] in ("move", "over"):
+                    replies.append(now - sent)
+                    sent = None
+                if message["type"] == "over":
+                    if join["opponent"] == "ai" or me == "X":
+                        finished.append(message["result"])
+                    break
+                if message["type"] == "error":
+                    raise RuntimeError(message["message"])
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients, games, join, seed=0):
+    """Run clients concurrently; return (acks, replies, finished, errors, elapsed)"""
+    connect_limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    acks, replies, finished = [], [], []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_client(host, port, games, join, seed + number, connect_limit, acks, replies,
+                     finished)
+          for number in range(clients)),
+        return_exceptions=True,
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    return acks, replies, finished, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Tic Tac Toe game server")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument("--clients", type=int, default=10000, help="concurrent connections")
+    parser.add_argument("--games", type=int, default=1, help="games per connection")
+    parser.add_argument("--opponent", choices=("ai", "human"), default="ai",
+                        help="play the server's AI, or pair clients with each other")
+    parser.add_argument("--difficulty", default="hard", help="AI strategy name")
+    parser.add_argument("--rows", type=int, default=3, help="board rows")
+    parser.add_argument("--cols", type=int, default=3, help="board columns")
+    parser.add_argument("-k", type=int, default=None, help="marks in a row needed to win")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    args = parser.parse_args(argv)
+
+    raise_open_file_limit()
+    join = {"type": "join", "opponent": args.opponent, "rows": args.rows, "cols": args.cols,
+            "k": args.k}
+    if args.opponent == "ai":
+        join["difficulty"] = args.difficulty
+    acks, replies, finished, errors, elapsed = asyncio.run(
+        run_load(args.host, args.port, args.clients, args.games, join, args.seed))
+
+    print(f"{len(finished)} games on {args.clients - len(errors)} connections in {elapsed:.2f}s")
+    for label, values in (("ack", acks), ("reply", replies)):
+        values.sort()
+        print(f"  {label:<6} p50 {percentile(values, 0.50) * 1000:8.2f} ms   "
+              f"p99 {percentile(values, 0.99) * 1000:8.2f} ms   ({len(values)} moves)")
+    if errors:
+        print(f"  {len(errors)} connections failed, first error: {errors[0]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Monte Carlo Tree Search (UCT) for m,n,k boards
+
+An anytime strategy: it runs random playouts until an iteration count or a
+wall-clock budget is used up, so strength can be traded for latency.  The
+tree is kept between calls and re-rooted at the current position, so work
+done while thinking about earlier moves of the same game is reused.
+"""
+
+import math
+import random
+import time
+
+from mnk import EMPTY, other_player
+from search import candidate_moves
+
+# How many iterations to run between clock checks
+CHECK_INTERVAL = 16
+
+
+class Node:
+    """A position in the search tree, reached by ``move`` from its parent"""
+
+    __slots__ = ("move", "parent", "player", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, parent, player, untried):
+        self.move = move
+        self.parent = parent
+        # Player who made ``move``; wins are counted from their point of view
+        self.player = player
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.wins / child.visits
+            + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+    def find_child(self, move):
+        for child in self.children:
+            if child.move == move:
+                return child
+        return None
+
+
+class MonteCarloTreeSearch:
+    """UCT search with random playouts and tree reuse across moves"""
+
+    def __init__(self, iterations=None, time_budget=1.0, exploration=math.sqrt(2), seed=None):
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.root = None
+        self.root_cells = None
+        self.playouts = 0
+        self.elapsed = 0.0
+
+    @property
+    def playouts_per_second(self):
+        """Playout rate of the most recent search"""
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def reset(self):
+        """Forget the tree, e.g. when a new game starts"""
+        self.root = None
+        self.root_cells = None
+
+    def _reuse_root(self, board, player):
+        """Return the stored subtree for board if it follows from the old root"""
+        root = self.root
+        if root is None or len(self.root_cells) != len(board.cells):
+            return None
+        new_moves = []
+        for index, (old, new) in enumerate(zip(self.root_cells, board.cells)):
+            if old != new:
+                if old != EMPTY:
+                    return None  # Not a continuation of the stored game
+                new_moves.append(index)
+        # Walk down the tree, taking each side's new mark in turn
+        to_move = other_player(root.player)
+        while new_moves:
+            moves = [index for index in new_moves if board.cells[index] == to_move]
+            if len(moves) != 1:
+                return None
+            root = root.find_child(moves[0])
+            if root is None:
+                return None
+            new_moves.remove(moves[0])
+            to_move = other_player(to_move)
+        if to_move != player:
+            return None
+        return root
+
+    def search(self, board, player):
+        """Return the index of the best move for player on board"""
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        root = self._reuse_root(board, player)
+        if root is None:
+            root = Node(None, None, other_player(player), candidate_moves(board))
+        root.parent = None
+        self.root = root
+        self.root_cells = list(board.cells)
+
+        board = board.copy()
+        rng = self.random
+        exploration = self.exploration
+        self.playouts = 0
+        iteration = 0
+        while self.iterations is None or iteration < self.iterations:
+            if deadline is not None and iteration % CHECK_INTERVAL == 0 and iteration:
+                if time.perf_counter() > deadline:
+                    break
+            iteration += 1
+
+            node = root
+            depth = 0
+            winner = None
+            # Selection
+            while not node.untried and node.children:
+                node = node.select_child(exploration)
+                board.play(node.move, node.player)
+                depth += 1
+            if board.winner is None and not node.untried and not node.children:
+                winner = None  # Terminal draw
+            elif board.winner is None:
+                # Expansion
+                index = node.untried.pop(rng.randrange(len(node.untried)))
+                mover = other_player(node.player)
+                board.play(index, mover)
+                depth += 1
+                child = Node(index, node, mover, [] if board.winner else candidate_moves(board))
+                node.children.append(child)
+                node = child
+                # Simulation
+                winner = board.winner if board.winner else self._playout(board, other_player(mover))
+            else:
+                winner = board.winner
+
+            # Backpropagation
+            while node is not None:
+                node.visits += 1
+                if winner == node.player:
+                    node.wins += 1.0
+                elif winner is None:
+                    node.wins += 0.5
+                node = node.parent
+            for _ in range(depth):
+                board.undo()
+
+        self.playouts = iteration
+        self.elapsed = time.perf_counter() - start
+        if not root.children:
+            moves = candidate_moves(board)
+            return moves[0] if moves else None
+        return max(root.children, key=lambda child: child.visits).move
+
+    def _playout(self, board, player):
+        """Play random moves to the end, restore the board and return the winner"""
+        cells = board.cells
+        saved = cells[:]
+        empty = [index for index, cell in enumerate(cells) if cell == EMPTY]
+        self.random.shuffle(empty)
+        winner = None
+        for index in empty:
+            cells[index] = player
+            if board.is_winning_move(index, player):
+                winner = player
+                break
+            player = other_player(player)
+        cells[:] = saved
+        return winner
@@ -0,0 +1,310 @@
+"""
+Generalized m,n,k board
+
+An ``rows`` x ``cols`` board where a player wins by getting ``k`` marks in
+a row horizontally, vertically or diagonally.  Classic Tic Tac Toe is the
+3,3,3 game; 4x4, five-in-a-row on 5x5 and 15x15 gomoku use the same code.
+
+Cells are stored in a flat list indexed by ``row * cols + col``.  After a
+move only the four lines through that cell are scanned, so checking a move
+costs O(k) instead of rescanning the whole board.
+
+``LineIndex`` keeps X and O counts for every winning line, updated move by
+move, for questions about the whole board: immediate wins, forced blocks,
+forks and whether any line can still be won.
+"""
+
+from functools import lru_cache
+
+EMPTY = " "
+
+# Row/column steps for horizontal, vertical, diagonal and anti-diagonal lines
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def other_player(player):
+    return "O" if player == "X" else "X"
+
+
+class Geometry:
+    """Precomputed lookup data shared by every board of the same shape"""
+
+    def __init__(self, rows, cols, k):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        # rays[index] holds, for each direction, the cells up to k-1 steps
+        # forward and backward from index
+        self.rays = tuple(
+            tuple(
+                (self._ray(index, d_row, d_col), self._ray(index, -d_row, -d_col))
+                for d_row, d_col in DIRECTIONS
+            )
+            for index in range(self.size)
+        )
+        # Every run of k cells that can hold a win, as tuples of indices
+        self.lines = tuple(self._lines())
+        # Lines through each cell, by position in lines, and each line's sum
+        # of cell indices (see LineIndex)
+        cell_lines = [[] for _ in range(self.size)]
+        for line_id, line in enumerate(self.lines):
+            for index in line:
+                cell_lines[index].append(line_id)
+        self.cell_lines = tuple(tuple(line_ids) for line_ids in cell_lines)
+        self.line_sums = tuple(sum(line) for line in self.lines)
+        # Cells within two steps of each cell, used to focus search on
+        # the active part of large boards
+        self.neighbours = tuple(self._neighbours(index, 2) for index in range(self.size))
+        # Distance from the centre, used to order moves
+        center_row, center_col = (rows - 1) / 2, (cols - 1) / 2
+        self.center_distance = tuple(
+            max(abs(index // cols - center_row), abs(index % cols - center_col))
+            for index in range(self.size)
+        )
+
+    def _lines(self):
+        for index in range(self.size):
+            for d_row, d_col in DIRECTIONS:
+                ray = self._ray(index, d_row, d_col)
+                if len(ray) == self.k - 1:
+                    yield (index,) + ray
+
+    def _neighbours(self, index, radius):
+        row, col = divmod(index, self.cols)
+        return tuple(
+            r * self.cols + c
+            for r in range(max(0, row - radius), min(self.rows, row + radius + 1))
+            for c in range(max(0, col - radius), min(self.cols, col + radius + 1))
+            if (r, c) != (row, col)
+        )
+
+    def _ray(self, index, d_row, d_col):
+        row, col = divmod(index, self.cols)
+        ray = []
+        for _ in range(self.k - 1):
+            row += d_row
+            col += d_col
+            if not (0 <= row < self.rows and 0 <= col < self.cols):
+                break
+            ray.append(row * self.cols + col)
+        return tuple(ray)
+
+
+@lru_cache(maxsize=None)
+def get_geometry(rows, cols, k):
+    return Geometry(rows, cols, k)
+
+
+class MNKBoard:
+    """Board for the m,n,k game with incremental win detection"""
+
+    __slots__ = ("rows", "cols", "k", "geometry", "cells", "moves", "winner")
+
+    def __init__(self, rows=3, cols=3, k=None):
+        if k is None:
+            k = min(rows, cols)
+        if rows < 1 or cols < 1 or not 1 <= k <= max(rows, cols):
+            raise ValueError(f"Invalid board {rows}x{cols} with k={k}")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.geometry = get_geometry(rows, cols, k)
+        self.cells = [EMPTY] * (rows * cols)
+        self.moves = []
+        self.winner = None
+
+    @classmethod
+    def from_list(cls, board, k=None):
+        """Build a board from a list-of-lists board
+
+        The move order of a list board is unknown, so ``moves`` lists the
+        occupied cells in board order and the winner is found with a full
+        scan.
+        """
+        mnk_board = cls(len(board), len(board[0]), k)
+        mnk_board.cells = [cell for row in board for cell in row]
+        mnk_board.moves = [index for index, cell in enumerate(mnk_board.cells) if cell != EMPTY]
+        for player in ("X", "O"):
+            if mnk_board.check_winner(player):
+                mnk_board.winner = player
+                break
+        return mnk_board
+
+    def to_list(self):
+        return [self.cells[row * self.cols:(row + 1) * self.cols] for row in range(self.rows)]
+
+    def copy(self):
+        board = MNKBoard.__new__(MNKBoard)
+        board.rows = self.rows
+        board.cols = self.cols
+        board.k = self.k
+        board.geometry = self.geometry
+        board.cells = self.cells[:]
+        board.moves = self.moves[:]
+        board.winner = self.winner
+        return board
+
+    @property
+    def size(self):
+        return self.geometry.size
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def coordinates(self, index):
+        return divmod(index, self.cols)
+
+    def is_valid_move(self, index):
+        return 0 <= index < self.geometry.size and self.cells[index] == EMPTY
+
+    def available_moves(self):
+        """Return the indices of all empty cells"""
+        return [index for index, cell in enumerate(self.cells) if cell == EMPTY]
+
+    def is_full(self):
+        return len(self.moves) == self.geometry.size or EMPTY not in self.cells
+
+    def is_over(self):
+        return self.winner is not None or self.is_full()
+
+    def is_winning_move(self, index, player):
+        """Return True if player owning index would complete k in a row"""
+        cells = self.cells
+        k = self.k
+        for forward, backward in self.geometry.rays[index]:
+            count = 1
+            for other in forward:
+                if cells[other] != player:
+                    break
+                count += 1
+            for other in backward:
+                if cells[other] != player:
+                    break
+                count += 1
+            if count >= k:
+                return True
+        return False
+
+    def play(self, index, player):
+        """Place player's mark at index and return True if it wins"""
+        self.cells[index] = player
+        self.moves.append(index)
+        if self.is_winning_move(index, player):
+            self.winner = player
+            return True
+        return False
+
+    def undo(self):
+        """Take back the last move and return its index"""
+        index = self.moves.pop()
+        self.cells[index] = EMPTY
+        self.winner = None
+        return index
+
+    def check_winner(self, player):
+        """Full-board scan for k in a row, for boards without move history"""
+        cells = self.cells
+        return any(
+            cell == player and self.is_winning_move(index, player)
+            for index, cell in enumerate(cells)
+        )
+
+
+class LineIndex:
+    """X and O counts for every winning line of a board, kept move by move
+
+    play() and undo() touch only the lines through the cell, so keeping the
+    index costs O(lines through a cell) per move.  winning_cells() checks
+    each line's counts in O(1) per line and is_dead() is O(1); forks()
+    does the same per-line check for each cell it tries.
+    """
+
+    __slots__ = ("geometry", "counts", "filled", "open")
+
+    def __init__(self, geometry):
+        lines = len(geometry.lines)
+        self.geometry = geometry
+        self.counts = {"X": [0] * lines, "O": [0] * lines}
+        # Sum of the occupied cell indices of each line: in a line with one
+        # empty cell, that cell is line_sums[line] - filled[line]
+        self.filled = [0] * lines
+        # Lines each player can still complete, i.e. with no opposing mark
+        self.open = {"X": lines, "O": lines}
+
+    @classmethod
+    def from_cells(cls, geometry, cells):
+        """Index a board that already has marks on it"""
+        index = cls(geometry)
+        for cell, player in enumerate(cells):
+            if player != EMPTY:
+                index.play(cell, player)
+        return index
+
+    @classmethod
+    def from_list(cls, board, k=None):
+        rows, cols = len(board), len(board[0])
+        geometry = get_geometry(rows, cols, min(rows, cols) if k is None else k)
+        return cls.from_cells(geometry, [cell for row in board for cell in row])
+
+    def play(self, index, player):
+        """Count player's mark at index"""
+        mine = self.counts[player]
+        filled = self.filled
+        closed = 0
+        for line in self.geometry.cell_lines[index]:
+            if not mine[line]:
+                closed += 1
+            mine[line] += 1
+            filled[line] += index
+        self.open[other_player(player)] -= closed
+
+    def undo(self, index, player):
+        """Remove player's mark at index from the counts"""
+        mine = self.counts[player]
+        filled = self.filled
+        reopened = 0
+        for line in self.geometry.cell_lines[index]:
+            mine[line] -= 1
+            if not mine[line]:
+                reopened += 1
+            filled[line] -= index
+        self.open[other_player(player)] += reopened
+
+    def winning_cells(self, player):
+        """Empty cells where player would complete a line"""
+        need = self.geometry.k - 1
+        mine = self.counts[player]
+        theirs = self.counts[other_player(player)]
+        sums = self.geometry.line_sums
+        filled = self.filled
+        return {sums[line] - filled[line] for line in range(len(mine))
+                if mine[line] == need and not theirs[line]}
+
+    def forks(self, player, moves):
+        """Cells of moves where player would make two new winning threats at once
+
+        moves are empty cell indices.  Only cells on two or more lines that
+        player could complete with two more marks are tried: each is played,
+        its new winning_cells() counted and the move undone.
+        """
+        need = self.geometry.k - 2
+        mine = self.counts[player]
+        theirs = self.counts[other_player(player)]
+        cell_lines = self.geometry.cell_lines
+        threats = self.winning_cells(player)
+        forks = set()
+        for index in moves:
+            open_lines = sum(1 for line in cell_lines[index]
+                             if mine[line] == need and not theirs[line])
+            if open_lines < 2:
+                continue
+            self.play(index, player)
+            if len(self.winning_cells(player) - threats) >= 2:
+                forks.add(index)
+            self.undo(index, player)
+        return forks
+
+    def is_dead(self):
+        """True when no line can be won by either player, so the game is a draw"""
+        return not self.open["X"] and not self.open["O"]
@@ -0,0 +1,234 @@
+"""
+Multi-core alpha-beta search
+
+Root splitting over a process pool: the first (principal) root move is
+searched to set a bound, then the remaining root moves are farmed out to
+worker processes.  All processes share one lockless transposition table
+in shared memory, so subtrees solved by one worker are reused by the
+others.
+
+At a fixed depth the result is the same move the serial search picks: the
+best score wins and ties go to the earliest move in the shared ordering.
+"""
+
+import atexit
+import os
+import struct
+import sys
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from mnk import EMPTY, MNKBoard
+from search import (
+    MATE_THRESHOLD, WIN_SCORE, AlphaBetaSearch, SearchResult, SearchTimeout,
+    candidate_moves, order_moves,
+)
+
+# Each slot holds (key ^ data, data) so a torn write from a concurrent
+# store fails the key check instead of returning a corrupt entry
+_SLOT = struct.Struct("<QQ")
+_SCORE_OFFSET = 1 << 31
+_MASK64 = (1 << 64) - 1
+
+
+class SharedTranspositionTable:
+    """Fixed-size, lockless transposition table in shared memory
+
+    Create it in the parent process and attach to it in workers by name.
+    """
+
+    def __init__(self, slots=1 << 20, name=None):
+        self.slots = slots
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=slots * _SLOT.size)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.buffer = self.memory.buf
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def probe(self, key):
+        """Return (depth, flag, score, move) for key, or None"""
+        check, data = _SLOT.unpack_from(self.buffer, (key % self.slots) * _SLOT.size)
+        if data == 0 or check ^ data != key:
+            return None
+        move = (data >> 42) & 0xFFFF
+        return (
+            (data >> 32) & 0xFF,
+            (data >> 40) & 0x3,
+            (data & 0xFFFFFFFF) - _SCORE_OFFSET,
+            move - 1 if move else None,
+        )
+
+    def store(self, key, depth, flag, score, move):
+        """Store an entry, always replacing whatever was in the slot"""
+        data = (
+            (score + _SCORE_OFFSET)
+            | (min(depth, 0xFF) << 32)
+            | (flag << 40)
+            | ((0 if move is None else move + 1) << 42)
+        )
+        _SLOT.pack_into(self.buffer, (key % self.slots) * _SLOT.size, (key ^ data) & _MASK64, data)
+
+    def clear(self):
+        self.buffer[:] = bytes(len(self.buffer))
+
+    def close(self):
+        """Detach from the segment; the creating process also frees it"""
+        self.buffer.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+# Table attached by each worker process at startup
+_worker_table = None
+
+
+def _init_worker(table_name, slots):
+    global _worker_table
+    _worker_table = SharedTranspositionTable(slots, name=table_name)
+
+
+def _search_root_move(rows, cols, k, cells, player, index, depth, alpha, deadline):
+    """Worker task: score one root move; returns (score, nodes) or None on timeout"""
+    board = MNKBoard(rows, cols, k)
+    board.cells = list(cells)
+    board.moves = [i for i, cell in enumerate(cells) if cell != EMPTY]
+    search = AlphaBetaSearch(time_budget=None, table=_worker_table)
+    if deadline is not None:
+        search.deadline = time.perf_counter() + (deadline - time.time())
+    try:
+        score = search.search_move(board, player, index, depth, alpha)
+    except SearchTimeout:
+        return None
+    return score, search.nodes
+
+
+class ParallelSearch:
+    """Iterative-deepening root-splitting search over a pool of workers"""
+
+    def __init__(self, workers=None, time_budget=1.0, max_depth=None, table_slots=1 << 20):
+        self.workers = workers or os.cpu_count() or 1
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table = SharedTranspositionTable(table_slots)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.table.name, table_slots),
+        )
+        self.nodes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            if sys.version_info >= (3, 9):
+                self.pool.shutdown(cancel_futures=True)
+            else:
+                self.pool.shutdown()
+            self.pool = None
+            self.table.close()
+
+    def search(self, board, player, time_budget=None, max_depth=None):
+        """Return a SearchResult with the best move for player on board
+
+        time_budget and max_depth default to the values given at creation.
+        """
+        time_budget = self.time_budget if time_budget is None else time_budget
+        max_depth = self.max_depth if max_depth is None else max_depth
+        start = time.perf_counter()
+        deadline = time.time() + time_budget if time_budget is not None else None
+        self.nodes = 0
+        board = board.copy()
+
+        empty = sum(1 for cell in board.cells if cell == EMPTY)
+        max_depth = empty if max_depth is None else min(max_depth, empty)
+        moves, winning = order_moves(board, player, candidate_moves(board))
+        if winning is not None:
+            return SearchResult(winning, WIN_SCORE - 1, 1, 1, time.perf_counter() - start, True)
+        if not moves:
+            return SearchResult(None, 0, 0, 0, time.perf_counter() - start, True)
+
+        best = SearchResult(moves[0], 0, 0, 0, 0.0, False)
+        for depth in range(1, max_depth + 1):
+            outcome = self._search_root(board, player, moves, depth, deadline)
+            if outcome is None:
+                break
+            move, score = outcome
+            moves.remove(move)
+            moves.insert(0, move)
+            best = SearchResult(move, score, depth, self.nodes, 0.0, depth == max_depth)
+            if abs(score) >= MATE_THRESHOLD:
+                best = best._replace(completed=True)
+                break
+        return best._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def _search_root(self, board, player, moves, depth, deadline):
+        """Search one iteration; return (move, score) or None on timeout"""
+        # Principal move first, in this process, to get a bound for the rest
+        principal = AlphaBetaSearch(time_budget=None, table=self.table)
+        if deadline is not None:
+            principal.deadline = time.perf_counter() + (deadline - time.time())
+        try:
+            alpha = principal.search_move(board, player, moves[0], depth)
+        except SearchTimeout:
+            return None
+        finally:
+            self.nodes += principal.nodes
+
+        cells = tuple(board.cells)
+        futures = [
+            self.pool.submit(_search_root_move, board.rows, board.cols, board.k,
+                             cells, player, index, depth, alpha, deadline)
+            for index in moves[1:]
+        ]
+        timeout = None if deadline is None else max(0.0, deadline - time.time())
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        if pending:
+            for future in pending:
+                future.cancel()
+            return None
+
+        best_move, best_score = moves[0], alpha
+        for index, future in zip(moves[1:], futures):
+            result = future.result()
+            if result is None:
+                return None
+            score, nodes = result
+            self.nodes += nodes
+            # Moves that fail to beat the principal bound return <= alpha;
+            # ties go to the earliest move, as in the serial search
+            if score > best_score:
+                best_score = score
+                best_move = index
+        return best_move, best_score
+
+
+# Searches shared by get_parallel_search, keyed by worker count
+_searches = {}
+
+
+def get_parallel_search(workers):
+    """Return a process-wide ParallelSearch with the given worker count"""
+    search = _searches.get(workers)
+    if search is None:
+        search = _searches[workers] = ParallelSearch(workers)
+    return search
+
+
+@atexit.register
+def _close_searches():
+    for search in _searches.values():
+        search.close()
+    _searches.clear()
@@ -0,0 +1,205 @@
+"""
+Opt-in instrumentation for searches and the game loop
+
+``enable()`` wraps the functions worth measuring -- AI strategies, the
+searches, win checks, rendering and input -- with versions that update
+the active ``Profile``; ``disable()`` puts the originals back.  While
+profiling is off nothing is wrapped, so the game runs exactly the code
+it runs without this module.
+
+Counters:
+
+* nodes            -- positions searched: table lookups of the 3x3 solver,
+                      alpha-beta nodes and MCTS playouts
+* cache_hits       -- 3x3 solver positions answered from its table
+* terminal_checks  -- win and draw checks
+* search_depth.max -- deepest completed alpha-beta iteration
+
+Timers (total, count and maximum seconds): ``think`` for every AI move
+plus ``move.<strategy>`` per strategy, ``render`` for screen clears and
+board drawing, and ``input`` for waiting on the player.
+
+    python tictactoe.py --profile
+"""
+
+import functools
+import time
+from collections import Counter
+
+# The Profile being filled in, or None while profiling is off
+PROFILE = None
+
+_ORIGINALS = []
+
+
+class Timer:
+    __slots__ = ("total", "count", "max")
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.total += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Profile:
+    """Counters and timers collected while profiling is enabled"""
+
+    def __init__(self):
+        self.counters = Counter()
+        self.timers = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def maximum(self, name, value):
+        if value > self.counters[name]:
+            self.counters[name] = value
+
+    def add_time(self, name, seconds):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Timer()
+        timer.add(seconds)
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+
+    def snapshot(self):
+        """Return the counters and timers as plain dicts"""
+        return {
+            "counters": dict(self.counters),
+            "timers": {
+                name: {"total": timer.total, "count": timer.count, "mean": timer.mean,
+                       "max": timer.max}
+                for name, timer in self.timers.items()
+            },
+        }
+
+    def summary(self):
+        """Yield report lines"""
+        think = self.timers.get("think")
+        if think is not None and think.total and self.counters["nodes"]:
+            yield f"  {'nodes/s':<22}{self.counters['nodes'] / think.total:>14.0f}"
+        for name, value in sorted(self.counters.items()):
+            yield f"  {name:<22}{value:>14}"
+        for name, timer in sorted(self.timers.items()):
+            yield (f"  {name:<22}{timer.total * 1000:>11.1f} ms  {timer.count:>6} calls  "
+                   f"mean {timer.mean * 1000:8.2f} ms  max {timer.max * 1000:8.2f} ms")
+
+
+def active():
+    """The active Profile, or None when profiling is off"""
+    return PROFILE
+
+
+def enable(game_module=None):
+    """Start profiling into a fresh Profile and return it
+
+    game_module is the tictactoe module to instrument; pass it when
+    tictactoe.py runs as __main__, since importing it would load a copy.
+    """
+    global PROFILE
+    if PROFILE is None:
+        _install(game_module)
+    PROFILE = Profile()
+    return PROFILE
+
+
+def disable():
+    """Stop profiling and restore the unwrapped functions"""
+    global PROFILE
+    while _ORIGINALS:
+        owner, name, original = _ORIGINALS.pop()
+        setattr(owner, name, original)
+    PROFILE = None
+
+
+def _wrap(owner, name, make_wrapper):
+    original = getattr(owner, name)
+    _ORIGINALS.append((owner, name, original))
+    setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+
+
+def _timed(timer_name):
+    def make_wrapper(original):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                PROFILE.add_time(timer_name, time.perf_counter() - start)
+        return wrapper
+    return make_wrapper
+
+
+def _counted(counter_name):
+    def make_wrapper(original):
+        def wrapper(*args, **kwargs):
+            PROFILE.count(counter_name)
+            return original(*args, **kwargs)
+        return wrapper
+    return make_wrapper
+
+
+def _install(tictactoe=None):
+    if tictactoe is None:
+        import tictactoe  # Imported here: tictactoe imports this module
+    import strategies
+    from mcts import MonteCarloTreeSearch
+    from mnk import MNKBoard
+    from parallel import ParallelSearch
+    from search import AlphaBetaSearch
+
+    def strategy_move(original):
+        def wrapper(self, *args, **kwargs):
+            table = strategies.HARD_AI_TABLE
+            hits, lookups = table.hits, table.hits + table.misses
+            start = time.perf_counter()
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                PROFILE.add_time("think", elapsed)
+                PROFILE.add_time(f"move.{self.name}", elapsed)
+                # Every node of the 3x3 solver is one table lookup
+                PROFILE.count("nodes", table.hits + table.misses - lookups)
+                PROFILE.count("cache_hits", table.hits - hits)
+        return wrapper
+
+    def search_result(original):
+        def wrapper(self, *args, **kwargs):
+            result = original(self, *args, **kwargs)
+            PROFILE.count("nodes", result.nodes)
+            PROFILE.maximum("search_depth.max", result.depth)
+            return result
+        return wrapper
+
+    def mcts_search(original):
+        def wrapper(self, *args, **kwargs):
+            try:
+                return original(self, *args, **kwargs)
+            finally:
+                PROFILE.count("nodes", self.playouts)
+        return wrapper
+
+    _wrap(strategies.Strategy, "move", strategy_move)
+    _wrap(AlphaBetaSearch, "search", search_result)
+    _wrap(ParallelSearch, "search", search_result)
+    _wrap(MonteCarloTreeSearch, "search", mcts_search)
+    _wrap(MNKBoard, "is_winning_move", _counted("terminal_checks"))
+    _wrap(tictactoe, "check_winner", _counted("terminal_checks"))
+    _wrap(tictactoe, "is_draw", _counted("terminal_checks"))
+    _wrap(tictactoe, "clear_screen", _timed("render"))
+    _wrap(tictactoe, "print_board", _timed("render"))
+    _wrap(tictactoe, "get_player_move", _timed("input"))
@@ -0,0 +1,282 @@
+"""
+Compact full-move game records
+
+Every finished game is stored as a 12-byte header followed by its moves:
+
+    timestamp  uint32  seconds since the epoch
+    rows, cols, k      one byte each
+    x, o       one byte each, the player kinds (see PLAYER_NAMES)
+    result     one byte: 0 unfinished, 1 X won, 2 O won, 3 draw, plus
+               EARLY_DRAW_FLAG if the game used early_draw
+    moves      uint16  number of moves
+
+Moves are cell indices in the order played: two per byte (high nibble
+first) on boards of up to 16 cells, one byte each up to 256 cells and two
+bytes beyond that.  A 3x3 game takes at most 17 bytes.
+
+Each process appends to its own shard in ``games.d/``: a ``.games`` data
+file and an ``.idx`` file holding the 8-byte offset of every record, so
+any game is found with one seek instead of decoding the file.  Shard
+names start with their creation time, and games are numbered across
+shards in that order; a number stays the same once every earlier shard
+is finished.
+"""
+
+import argparse
+import os
+import socket
+import struct
+import time
+import uuid
+from bisect import bisect_right
+from collections import namedtuple
+
+from engine import DRAW, Game
+
+GAMES_DIR = "games.d"
+DATA_SUFFIX = ".games"
+INDEX_SUFFIX = ".idx"
+
+HEADER = struct.Struct("<IBBBBBBH")
+OFFSET = struct.Struct("<Q")
+
+# Player kinds by code; anything else is stored as OTHER_PLAYER
+PLAYER_NAMES = ("human", "easy", "medium", "hard", "mcts", "mcts-500")
+OTHER_PLAYER = 255
+
+RESULT_CODES = {None: 0, "X": 1, "O": 2, DRAW: 3}
+RESULTS = {code: result for result, code in RESULT_CODES.items()}
+
+# Set in the result byte for games drawn as soon as no line could be won.
+# Records written before early draws lack it and were played out in full.
+EARLY_DRAW_FLAG = 0x80
+
+GameRecord = namedtuple(
+    "GameRecord",
+    ["timestamp", "rows", "cols", "k", "x_player", "o_player", "result", "moves", "early_draw"],
+)
+
+
+def player_code(name):
+    try:
+        return PLAYER_NAMES.index(name)
+    except ValueError:
+        return OTHER_PLAYER
+
+
+def player_name(code):
+    return PLAYER_NAMES[code] if code < len(PLAYER_NAMES) else "other"
+
+
+def _move_width(cells):
+    """Bytes per move, with 0.5 meaning a nibble"""
+    if cells <= 16:
+        return 0.5
+    return 1 if cells <= 256 else 2
+
+
+def encode_moves(moves, cells):
+    if cells <= 16:
+        padded = list(moves) + [0] * (len(moves) % 2)
+        return bytes(padded[i] << 4 | padded[i + 1] for i in range(0, len(padded), 2))
+    if cells <= 256:
+        return bytes(moves)
+    return struct.pack(f"<{len(moves)}H", *moves)
+
+
+def decode_moves(data, count, cells):
+    if cells <= 16:
+        moves = []
+        for byte in data:
+            moves.append(byte >> 4)
+            moves.append(byte & 0x0F)
+        return moves[:count]
+    if cells <= 256:
+        return list(data[:count])
+    return list(struct.unpack_from(f"<{count}H", data))
+
+
+def encode_game(game, x_player="human", o_player="human", timestamp=None):
+    """Encode a finished (or abandoned) engine.Game as bytes"""
+    moves = game.board.moves
+    header = HEADER.pack(
+        int(time.time() if timestamp is None else timestamp),
+        game.rows, game.cols, game.k,
+        player_code(x_player), player_code(o_player),
+        RESULT_CODES[game.result] | (EARLY_DRAW_FLAG if game.early_draw else 0), len(moves),
+    )
+    return header + encode_moves(moves, game.rows * game.cols)
+
+
+def record_size(header):
+    """Total bytes of the record starting with this header"""
+    _, rows, cols, _, _, _, _, count = HEADER.unpack(header)
+    return HEADER.size + int(count * _move_width(rows * cols) + 0.5)
+
+
+def decode_game(data):
+    """Decode one record into a GameRecord with 0-based cell indices"""
+    timestamp, rows, cols, k, x_code, o_code, result, count = HEADER.unpack_from(data)
+    moves = decode_moves(data[HEADER.size:], count, rows * cols)
+    return GameRecord(timestamp, rows, cols, k, player_name(x_code), player_name(o_code),
+                      RESULTS.get(result & ~EARLY_DRAW_FLAG), moves,
+                      bool(result & EARLY_DRAW_FLAG))
+
+
+def replay_record(record, ply=None):
+    """Rebuild the position after the first ply moves (default: all) as a Game
+
+    The game uses the early_draw rule the record was played with.
+    """
+    game = Game(record.rows, record.cols, record.k, early_draw=record.early_draw)
+    for index in record.moves[:ply]:
+        if not game.apply(index + 1):
+            raise ValueError(f"Illegal move {index + 1} in recorded game")
+    return game
+
+
+class GameLogWriter:
+    """Appends this process's games to its own shard"""
+
+    def __init__(self, directory=GAMES_DIR):
+        self.directory = directory
+        self.name = None
+        self.data = None
+        self.index = None
+
+    def write(self, game, x_player="human", o_player="human", timestamp=None):
+        """Append a game and return its number within this writer's shard"""
+        if self.data is None:
+            self._open()
+        record = encode_game(game, x_player, o_player, timestamp)
+        offset = self.data.tell()
+        self.data.write(record)
+        self.data.flush()
+        # The offset goes in last, so a crash never indexes a partial record
+        self.index.write(OFFSET.pack(offset))
+        self.index.flush()
+        return self.index.tell() // OFFSET.size - 1
+
+    def close(self):
+        for f in (self.data, self.index):
+            if f is not None:
+                f.close()
+        self.data = self.index = None
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.name = (f"{int(time.time() * 1000):013d}-{socket.gethostname()}-"
+                     f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        base = os.path.join(self.directory, self.name)
+        self.data = open(base + DATA_SUFFIX, "ab")
+        self.index = open(base + INDEX_SUFFIX, "ab")
+
+
+class GameLog:
+    """Read access to every shard in a games directory, by game number"""
+
+    def __init__(self, directory=GAMES_DIR):
+        self.directory = directory
+        self.shards = []
+        # Games in all shards before each shard
+        self.starts = []
+        self._files = {}
+        self.refresh()
+
+    def refresh(self):
+        """Pick up new shards and games written since the last refresh"""
+        try:
+            names = sorted(name[:-len(INDEX_SUFFIX)] for name in os.listdir(self.directory)
+                           if name.endswith(INDEX_SUFFIX))
+        except FileNotFoundError:
+            names = []
+        self.shards, self.starts = [], []
+        total = 0
+        for name in names:
+            size = os.path.getsize(os.path.join(self.directory, name + INDEX_SUFFIX))
+            self.shards.append((name, size // OFFSET.size))
+            self.starts.append(total)
+            total += size // OFFSET.size
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def locate(self, number):
+        """Return (shard name, number within the shard) for a game number"""
+        if not 0 <= number < self.total:
+            raise IndexError(f"game {number} out of range")
+        shard = bisect_right(self.starts, number) - 1
+        return self.shards[shard][0], number - self.starts[shard]
+
+    def __getitem__(self, number):
+        name, local = self.locate(number)
+        data, index = self._open(name)
+        index.seek(local * OFFSET.size)
+        (offset,) = OFFSET.unpack(index.read(OFFSET.size))
+        data.seek(offset)
+        header = data.read(HEADER.size)
+        return decode_game(header + data.read(record_size(header) - HEADER.size))
+
+    def replay(self, number, ply=None):
+        """Rebuild game number after ply moves (default: the final position)"""
+        return replay_record(self[number], ply)
+
+    def __iter__(self):
+        for name, count in self.shards:
+            yield from iter_shard(os.path.join(self.directory, name), count)
+
+    def close(self):
+        for data, index in self._files.values():
+            data.close()
+            index.close()
+        self._files.clear()
+
+    def _open(self, name):
+        files = self._files.get(name)
+        if files is None:
+            base = os.path.join(self.directory, name)
+            files = self._files[name] = (open(base + DATA_SUFFIX, "rb"),
+                                         open(base + INDEX_SUFFIX, "rb"))
+        return files
+
+
+def iter_shard(base, count=None):
+    """Yield the GameRecords of one shard (path without suffix) in order
+
+    Reads the data file sequentially; count limits it to the indexed games.
+    """
+    if count is None:
+        count = os.path.getsize(base + INDEX_SUFFIX) // OFFSET.size
+    with open(base + DATA_SUFFIX, "rb") as data:
+        for _ in range(count):
+            header = data.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            yield decode_game(header + data.read(record_size(header) - HEADER.size))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or replay recorded games")
+    parser.add_argument("number", type=int, nargs="?", help="game to replay (default: count games)")
+    parser.add_argument("--ply", type=int, default=None, help="stop after this many moves")
+    parser.add_argument("--dir", default=GAMES_DIR, help="games directory")
+    args = parser.parse_args(argv)
+
+    log = GameLog(args.dir)
+    if args.number is None:
+        print(f"{len(log)} games in {len(log.shards)} shards")
+        return
+    record = log[args.number]
+    game = replay_record(record, args.ply)
+    print(f"Game {args.number}: {record.x_player} (X) vs {record.o_player} (O), "
+          f"{record.rows}x{record.cols} k={record.k}, "
+          f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.timestamp))}")
+    print("Moves: " + " ".join(str(index + 1) for index in game.board.moves))
+    for row in game.to_list():
+        print(" " + " | ".join(cell if cell.strip() else "." for cell in row))
+    print(f"Result: {game.result or 'in progress'}")
+
+
+if __name__ == "__main__":
+    main()
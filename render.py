@@ -0,0 +1,183 @@
+"""
+Differential ANSI renderer for the terminal game
+
+The first frame after a clear is drawn in full.  Each frame after that
+moves the cursor only to the cells and status lines that changed and
+rewrites them, then erases the prompt area below the frame.  Each frame
+goes to the terminal as a single write, and no subprocess is started.
+
+The frame starts at the top of the screen, so cursor positions are
+absolute.  Prompts and typed input below the frame must not scroll the
+screen.  If the terminal leaves fewer than PROMPT_ROOM free lines under
+the frame, every frame is drawn in full instead.  When output is not a
+terminal, frames are written in full without cursor movement.
+
+Boards of any size are drawn.  The position reference grid sits beside
+the board while both fit in the terminal width.  On wider boards the
+reference grid is dropped and each empty cell shows its number, dimmed.
+"""
+
+import shutil
+import sys
+
+CSI = "\033["
+CLEAR = CSI + "H" + CSI + "2J" + CSI + "3J"
+ERASE_LINE = CSI + "2K"
+ERASE_BELOW = CSI + "J"
+
+# Lines kept free below the frame for prompts, input and messages
+PROMPT_ROOM = 8
+
+# Columns between the reference grid and the board
+GAP = 13
+
+
+# ANSI color codes for colorful output
+class Colors:
+    RED = '\033[91m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    BLUE = '\033[94m'
+    MAGENTA = '\033[95m'
+    CYAN = '\033[96m'
+    WHITE = '\033[97m'
+    BOLD = '\033[1m'
+    DIM = '\033[2m'
+    RESET = '\033[0m'
+
+
+def move_to(row, col=1):
+    """Escape sequence that moves the cursor to a 1-based screen position"""
+    return f"{CSI}{row};{col}H"
+
+
+class Layout:
+    """Where everything goes for one board shape and terminal width"""
+
+    def __init__(self, rows, cols, width, title):
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.cell_width = len(str(rows * cols))
+        # Cells are split by " | " with a rule between rows, or on boards
+        # too wide for that by single spaces with no rules
+        self.divider = " | "
+        self.grid_width = cols * (self.cell_width + 3) - 3
+        if self.grid_width + 2 > width:
+            self.divider = " "
+            self.grid_width = cols * (self.cell_width + 1) - 1
+        self.row_step = 2 if self.divider == " | " else 1
+        reference_width = self.grid_width + 2
+        self.reference = 2 * reference_width + GAP <= width
+        # 0-based column where the board's row text starts
+        self.board_left = reference_width + GAP if self.reference else 0
+        self.header = [
+            "",
+            Colors.CYAN + "=" * 50 + Colors.RESET,
+            Colors.BOLD + Colors.YELLOW + title.center(50).rstrip() + Colors.RESET,
+            Colors.CYAN + "=" * 50 + Colors.RESET,
+            "",
+        ]
+        if self.reference:
+            self.header.append(f"{Colors.BLUE}Position Reference:{Colors.RESET}"
+                               + " " * (self.board_left - len("Position Reference:"))
+                               + f"{Colors.BOLD}Current Board:{Colors.RESET}")
+        else:
+            self.header.append(f"{Colors.BOLD}Current Board:{Colors.RESET}")
+        # 1-based screen rows of the first board row and the first status line
+        self.board_top = len(self.header) + 1
+        self.status_top = self.board_top + self.row_step * (rows - 1) + 2
+
+    def cell_position(self, index):
+        row, col = divmod(index, self.cols)
+        return (self.board_top + self.row_step * row,
+                self.board_left + 3 + col * (self.cell_width + len(self.divider)))
+
+    def cell(self, symbol, index):
+        if symbol == "X":
+            return Colors.RED + Colors.BOLD + symbol.center(self.cell_width) + Colors.RESET
+        if symbol == "O":
+            return Colors.GREEN + Colors.BOLD + symbol.center(self.cell_width) + Colors.RESET
+        if self.reference:
+            return " " * self.cell_width
+        return Colors.DIM + str(index + 1).rjust(self.cell_width) + Colors.RESET
+
+    def lines(self, cells, status):
+        """Every line of the frame"""
+        lines = list(self.header)
+        separator = "  " + "-" * self.grid_width
+        for row in range(self.rows):
+            first = row * self.cols
+            board = "  " + self.divider.join(self.cell(cells[index], index)
+                                      for index in range(first, first + self.cols))
+            if self.reference:
+                numbers = "  " + self.divider.join(str(index + 1).rjust(self.cell_width)
+                                            for index in range(first, first + self.cols))
+                board = numbers.ljust(self.board_left) + board
+            lines.append(board)
+            if row < self.rows - 1 and self.row_step == 2:
+                lines.append(separator.ljust(self.board_left) + separator
+                             if self.reference else separator)
+        lines.append("")
+        lines.extend(status)
+        return lines
+
+
+class TerminalRenderer:
+    """Draws boards and status lines, rewriting only what changed since the last frame"""
+
+    def __init__(self, stream=None, title="TIC-TAC-TOE GAME"):
+        # None means whatever sys.stdout is at the time of drawing
+        self.stream = stream
+        self.title = title
+        self.layout = None
+        # What the screen shows; None until a full frame has been drawn
+        self.cells = None
+        self.status = []
+
+    def _output(self):
+        return self.stream if self.stream is not None else sys.stdout
+
+    def clear(self):
+        """Clear the screen; the next frame is drawn in full"""
+        output = self._output()
+        if output.isatty():
+            output.write(CLEAR)
+            output.flush()
+        self.cells = None
+
+    def draw(self, board, status=()):
+        """Draw board (a list of rows) with status lines under it"""
+        output = self._output()
+        cells = [cell for row in board for cell in row]
+        status = list(status)
+        rows, cols = len(board), len(board[0])
+        width, height = shutil.get_terminal_size()
+        layout = self.layout
+        if layout is None or (layout.rows, layout.cols, layout.width) != (rows, cols, width):
+            layout = self.layout = Layout(rows, cols, width, self.title)
+            self.cells = None
+
+        if not output.isatty():
+            frame = "\n".join(layout.lines(cells, status)) + "\n"
+        elif self.cells is None or layout.status_top + len(status) + PROMPT_ROOM > height:
+            frame = CLEAR + "\n".join(layout.lines(cells, status)) + "\n"
+        else:
+            frame = self._changes(layout, cells, status)
+        output.write(frame)
+        output.flush()
+        self.cells = cells
+        self.status = status
+
+    def _changes(self, layout, cells, status):
+        parts = []
+        for index, (old, new) in enumerate(zip(self.cells, cells)):
+            if old != new:
+                row, col = layout.cell_position(index)
+                parts.append(move_to(row, col) + layout.cell(new, index))
+        for offset, line in enumerate(status):
+            if offset >= len(self.status) or self.status[offset] != line:
+                parts.append(move_to(layout.status_top + offset) + ERASE_LINE + line)
+        # Old status lines past the new ones and anything typed below go too
+        parts.append(move_to(layout.status_top + len(status)) + ERASE_BELOW)
+        return "".join(parts)
@@ -0,0 +1,290 @@
+"""
+Alpha-beta game-tree search for m,n,k boards
+
+Negamax with alpha-beta pruning, threat-first move ordering and iterative
+deepening under a hard per-move time budget.  When the budget runs out the
+best move of the deepest completed iteration is returned, so response time
+is set by the deadline rather than by the size of the board.
+"""
+
+import random
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from mnk import EMPTY, other_player
+
+# Mate scores are WIN_SCORE minus the ply at which the game ends, so faster
+# wins and slower losses are preferred; anything past MATE_THRESHOLD is a
+# proven result rather than a heuristic estimate
+WIN_SCORE = 1000000
+MATE_THRESHOLD = WIN_SCORE - 1000
+
+# Boards larger than this only consider cells near existing marks
+FULL_WIDTH_CELLS = 16
+
+# How many nodes to search between clock checks
+CHECK_INTERVAL = 16
+
+# Transposition table entry bounds
+EXACT, LOWER, UPPER = 0, 1, 2
+
+SearchResult = namedtuple(
+    "SearchResult", ["move", "score", "depth", "nodes", "elapsed", "completed"]
+)
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline passes"""
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size):
+    """Return 64-bit (X, O) Zobrist keys for each cell plus a side-to-move key
+
+    Keys come from a fixed seed so every process hashes positions the same
+    way and can share one transposition table.
+    """
+    rng = random.Random(size)
+    cells = tuple((rng.getrandbits(64), rng.getrandbits(64)) for _ in range(size))
+    return cells, rng.getrandbits(64)
+
+
+def position_key(board, player):
+    """Zobrist hash of the board with player to move"""
+    cell_keys, side_key = zobrist_keys(board.geometry.size)
+    key = side_key if player == "O" else 0
+    for index, cell in enumerate(board.cells):
+        if cell == "X":
+            key ^= cell_keys[index][0]
+        elif cell == "O":
+            key ^= cell_keys[index][1]
+    return key
+
+
+def _to_table_score(score, ply):
+    """Make mate scores relative to the node before storing them"""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _from_table_score(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def evaluate(board, player):
+    """Heuristic score of a non-terminal position for player
+
+    Every k-cell window that only one side occupies counts for that side,
+    weighted steeply by how many marks it already holds.
+    """
+    cells = board.cells
+    score = 0
+    for line in board.geometry.lines:
+        mine = theirs = 0
+        for index in line:
+            cell = cells[index]
+            if cell == player:
+                mine += 1
+            elif cell != EMPTY:
+                theirs += 1
+        if mine and not theirs:
+            score += 1 << (2 * mine)
+        elif theirs and not mine:
+            score -= 1 << (2 * theirs)
+    return score
+
+
+def candidate_moves(board):
+    """Empty cells worth searching, before ordering"""
+    geometry = board.geometry
+    cells = board.cells
+    if geometry.size <= FULL_WIDTH_CELLS or not board.moves:
+        moves = [index for index, cell in enumerate(cells) if cell == EMPTY]
+        if geometry.size > FULL_WIDTH_CELLS:
+            # Empty large board: only the centre-most cells matter
+            nearest = min(geometry.center_distance)
+            moves = [index for index in moves if geometry.center_distance[index] == nearest]
+        return moves
+    seen = set()
+    moves = []
+    for played in board.moves:
+        for index in geometry.neighbours[played]:
+            if cells[index] == EMPTY and index not in seen:
+                seen.add(index)
+                moves.append(index)
+    if not moves:
+        moves = [index for index, cell in enumerate(cells) if cell == EMPTY]
+    return moves
+
+
+def order_moves(board, player, moves):
+    """Order moves threat-first: wins, blocks, then by centrality and contact
+
+    Returns (ordered_moves, winning_move_or_None).
+    """
+    opponent = other_player(player)
+    geometry = board.geometry
+    cells = board.cells
+    blocks = []
+    scored = []
+    for index in moves:
+        if board.is_winning_move(index, player):
+            return [index], index
+        if board.is_winning_move(index, opponent):
+            blocks.append(index)
+            continue
+        contact = 0
+        for forward, backward in geometry.rays[index]:
+            if forward and cells[forward[0]] != EMPTY:
+                contact += 1
+            if backward and cells[backward[0]] != EMPTY:
+                contact += 1
+        scored.append((geometry.center_distance[index] - contact, index))
+    scored.sort()
+    return blocks + [index for _, index in scored], None
+
+
+class AlphaBetaSearch:
+    """Iterative-deepening alpha-beta search with a per-move deadline
+
+    An optional transposition table (any object with ``probe(key)`` and
+    ``store(key, depth, flag, score, move)``) caches subtree results.
+    Entries are only reused at exactly the same remaining depth, so a
+    fixed-depth search returns the same values with or without a table.
+    """
+
+    def __init__(self, time_budget=1.0, max_depth=None, table=None):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table = table
+        self.nodes = 0
+        self.deadline = None
+
+    def search(self, board, player):
+        """Return a SearchResult with the best move for player on board"""
+        start = time.perf_counter()
+        self.deadline = start + self.time_budget if self.time_budget is not None else None
+        self.nodes = 0
+        board = board.copy()
+
+        empty = sum(1 for cell in board.cells if cell == EMPTY)
+        max_depth = empty if self.max_depth is None else min(self.max_depth, empty)
+        moves, winning = order_moves(board, player, candidate_moves(board))
+        if winning is not None:
+            return SearchResult(winning, WIN_SCORE - 1, 1, 1, time.perf_counter() - start, True)
+        if not moves:
+            return SearchResult(None, 0, 0, 0, time.perf_counter() - start, True)
+
+        best = SearchResult(moves[0], 0, 0, 0, 0.0, False)
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self._search_root(board, player, moves, depth)
+            except SearchTimeout:
+                break
+            # Search the previous best move first on the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            best = SearchResult(move, score, depth, self.nodes, 0.0, depth == max_depth)
+            if abs(score) >= MATE_THRESHOLD:
+                best = best._replace(completed=True)
+                break
+        return best._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def _search_root(self, board, player, moves, depth):
+        alpha = -WIN_SCORE - 1
+        best_move = moves[0]
+        for index in moves:
+            score = self.search_move(board, player, index, depth, alpha)
+            if score > alpha:
+                alpha = score
+                best_move = index
+        return best_move, alpha
+
+    def search_move(self, board, player, index, depth, alpha=-WIN_SCORE - 1):
+        """Score the root move index at depth against a lower bound alpha
+
+        Moves that cannot beat alpha return a value no greater than alpha.
+        """
+        opponent = other_player(player)
+        cell_keys, side_key = zobrist_keys(board.geometry.size)
+        key = position_key(board, player) ^ cell_keys[index][player == "O"] ^ side_key
+        board.play(index, player)
+        try:
+            return -self._negamax(board, opponent, depth - 1, -WIN_SCORE - 1, -alpha, 1, key)
+        finally:
+            board.undo()
+
+    def _negamax(self, board, player, depth, alpha, beta, ply, key):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % CHECK_INTERVAL == 0:
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+
+        table = self.table
+        table_move = None
+        if table is not None and depth > 0:
+            entry = table.probe(key)
+            if entry is not None:
+                entry_depth, flag, score, table_move = entry
+                if entry_depth == depth:
+                    score = _from_table_score(score, ply)
+                    if (flag == EXACT or (flag == LOWER and score >= beta)
+                            or (flag == UPPER and score <= alpha)):
+                        return score
+
+        moves = candidate_moves(board)
+        if not moves:
+            return 0  # Board full: draw
+        if depth <= 0:
+            for index in moves:
+                if board.is_winning_move(index, player):
+                    return WIN_SCORE - ply - 1
+            return evaluate(board, player)
+        moves, winning = order_moves(board, player, moves)
+        if winning is not None:
+            return WIN_SCORE - ply - 1
+        if table_move is not None and table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+
+        opponent = other_player(player)
+        cell_keys, side_key = zobrist_keys(board.geometry.size)
+        side = player == "O"
+        original_alpha = alpha
+        best = -WIN_SCORE - 1
+        best_move = moves[0]
+        for index in moves:
+            board.play(index, player)
+            score = -self._negamax(board, opponent, depth - 1, -beta, -alpha, ply + 1,
+                                   key ^ cell_keys[index][side] ^ side_key)
+            board.undo()
+            if score > best:
+                best = score
+                best_move = index
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if table is not None:
+            if best <= original_alpha:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            table.store(key, depth, flag, _to_table_score(best, ply), best_move)
+        return best
+
+
+def find_best_move(board, player, time_budget=1.0, max_depth=None, table=None):
+    """Search board for player and return the best move index"""
+    return AlphaBetaSearch(time_budget, max_depth, table).search(board, player).move
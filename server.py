@@ -0,0 +1,368 @@
+"""
+Asyncio multiplayer game server
+
+Hosts many concurrent games from one process over TCP.  The protocol is
+line-delimited JSON: every line is one object with a "type".
+
+client -> server:
+
+    {"type": "join", "opponent": "human"}
+    {"type": "join", "opponent": "ai", "difficulty": "hard", "side": "X"}
+    {"type": "move", "position": 5}
+    {"type": "leave"}
+
+server -> client:
+
+    {"type": "waiting"}
+    {"type": "start", "game": 1, "you": "X", "opponent": "human", "rows": 3, "cols": 3, "k": 3}
+    {"type": "move", "player": "X", "position": 5}
+    {"type": "over", "result": "X"}          (or "O" or "draw")
+    {"type": "error", "message": "..."}
+
+A join may also give "rows", "cols" and "k"; human players are only
+matched with others waiting for the same board.  "leave" or disconnecting
+during a game forfeits it, and the over message then carries
+"reason": "forfeit".  Positions are numbered from 1, row by row.
+
+AI moves run in a process pool so searches never stall the event loop.
+Each connection has a bounded outgoing queue drained by its own writer
+task; a client that stops reading until the queue fills is disconnected
+instead of making the server buffer without limit.
+
+    python server.py --port 8765 --ai-workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+
+import strategies
+from engine import DRAW, Game
+from mnk import other_player
+
+DEFAULT_PORT = 8765
+
+# Longest accepted request line, in bytes
+MAX_LINE = 4096
+
+# Messages queued for a client before it is dropped as too slow
+QUEUE_SIZE = 256
+
+# Largest board side a client may ask for
+MAX_SIDE = 19
+
+# Seconds a closing connection may take to flush its queued messages
+CLOSE_TIMEOUT = 5.0
+
+# Pending connections the listening socket holds, for bursts of clients
+BACKLOG = 4096
+
+
+def raise_open_file_limit(wanted=65536):
+    """Raise the soft open-file limit toward wanted, where the OS allows it"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def is_int(value):
+    """True for JSON integers; true and false decode as bool, a subclass of int
+
+    Board sizes are checked with it.  Positions are checked by Game.is_legal.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def compute_ai_move(difficulty, board, player, k, options):
+    """Run a strategy in a worker process and return its position"""
+    return strategies.get_strategy(difficulty).move(board, player, k, **options)
+
+
+def _init_worker(tablebase_path):
+    if tablebase_path:
+        strategies.load_tablebase(tablebase_path)
+
+
+class Match:
+    """One game between two connections, or a connection and an AI"""
+
+    __slots__ = ("id", "game", "players", "difficulty", "finished")
+
+    def __init__(self, match_id, game, players, difficulty=None):
+        self.id = match_id
+        self.game = game
+        # Side -> Connection, with None for the AI's side
+        self.players = players
+        self.difficulty = difficulty
+        # Set when the game ends, including by forfeit
+        self.finished = False
+
+    def broadcast(self, message):
+        for connection in self.players.values():
+            if connection is not None:
+                connection.send(message)
+
+    def side_of(self, connection):
+        for side, player in self.players.items():
+            if player is connection:
+                return side
+        return None
+
+
+class Connection:
+    """A client socket with a bounded outgoing queue"""
+
+    def __init__(self, server, reader, writer, queue_size=QUEUE_SIZE):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.outbox = asyncio.Queue(queue_size)
+        self.match = None
+        self.closed = False
+        self.writer_task = None
+
+    def send(self, message):
+        """Queue a message; None asks the writer to flush and stop"""
+        if self.closed:
+            return
+        try:
+            self.outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            # The client is not reading; drop it rather than buffer forever
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+            if self.writer_task is not None and self.writer_task is not asyncio.current_task():
+                self.writer_task.cancel()
+
+    def start_writer(self):
+        self.writer_task = asyncio.ensure_future(self.write_loop())
+        return self.writer_task
+
+    async def write_loop(self):
+        """Write queued messages, batching whatever is ready into one drain"""
+        try:
+            stopping = False
+            while not stopping:
+                messages = [await self.outbox.get()]
+                while not self.outbox.empty():
+                    messages.append(self.outbox.get_nowait())
+                stopping = None in messages
+                self.writer.write(b"".join(
+                    json.dumps(message, separators=(",", ":")).encode() + b"\n"
+                    for message in messages if message is not None
+                ))
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.close()
+
+
+class GameServer:
+    """Matchmaking and game sessions for all connected clients"""
+
+    def __init__(self, ai_workers=None, ai_time_budget=strategies.AI_TIME_BUDGET,
+                 queue_size=QUEUE_SIZE, tablebase_path=None):
+        self.executor = ProcessPoolExecutor(max_workers=ai_workers or os.cpu_count() or 1,
+                                            initializer=_init_worker, initargs=(tablebase_path,))
+        self.ai_options = {"time_budget": ai_time_budget}
+        self.queue_size = queue_size
+        # (rows, cols, k) -> Connection waiting for a human opponent
+        self.waiting = {}
+        self.match_ids = count(1)
+        self.connections = 0
+        self.games_started = 0
+        self.games_finished = 0
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE,
+                                            backlog=BACKLOG)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    async def handle(self, reader, writer):
+        connection = Connection(self, reader, writer, self.queue_size)
+        writer_task = connection.start_writer()
+        self.connections += 1
+        try:
+            while not connection.closed:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    connection.send({"type": "error", "message": "line too long"})
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError("expected a JSON object")
+                    self.dispatch(connection, message)
+                except ValueError as e:
+                    connection.send({"type": "error", "message": str(e)})
+        finally:
+            self.connections -= 1
+            self.leave(connection)
+            # Let queued messages go out before the socket closes
+            connection.send(None)
+            try:
+                await asyncio.wait_for(writer_task, CLOSE_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            connection.close()
+
+    def dispatch(self, connection, message):
+        kind = message.get("type")
+        if kind == "join":
+            self.join(connection, message)
+        elif kind == "move":
+            self.move(connection, message.get("position"))
+        elif kind == "leave":
+            self.leave(connection)
+        else:
+            raise ValueError(f"unknown message type {kind!r}")
+
+    def join(self, connection, message):
+        if connection.match is not None or connection in self.waiting.values():
+            raise ValueError("already in a game")
+        rows, cols, k = message.get("rows", 3), message.get("cols", 3), message.get("k")
+        if not all(is_int(value) and 1 <= value <= MAX_SIDE for value in (rows, cols)):
+            raise ValueError(f"rows and cols must be between 1 and {MAX_SIDE}")
+        k = min(rows, cols) if k is None else k
+        if not is_int(k) or not 1 <= k <= max(rows, cols):
+            raise ValueError("k must be between 1 and the longest side")
+
+        if message.get("opponent", "human") == "ai":
+            difficulty = message.get("difficulty", "hard")
+            if difficulty not in strategies.STRATEGIES:
+                raise ValueError(f"unknown difficulty {difficulty!r}")
+            side = message.get("side", "X")
+            if side not in ("X", "O"):
+                raise ValueError("side must be X or O")
+            players = {side: connection, other_player(side): None}
+            self.start(Match(next(self.match_ids), Game(rows, cols, k), players, difficulty))
+            return
+
+        key = (rows, cols, k)
+        opponent = self.waiting.pop(key, None)
+        if opponent is None or opponent.closed:
+            self.waiting[key] = connection
+            connection.send({"type": "waiting"})
+            return
+        players = {"X": opponent, "O": connection}
+        self.start(Match(next(self.match_ids), Game(rows, cols, k), players))
+
+    def start(self, match):
+        self.games_started += 1
+        game = match.game
+        for side, connection in match.players.items():
+            if connection is not None:
+                connection.match = match
+                opponent = "human" if match.players[other_player(side)] else f"ai:{match.difficulty}"
+                connection.send({"type": "start", "game": match.id, "you": side,
+                                 "opponent": opponent, "rows": game.rows, "cols": game.cols,
+                                 "k": game.k})
+        self.request_ai_move(match)
+
+    def move(self, connection, position):
+        match = connection.match
+        if match is None:
+            raise ValueError("not in a game")
+        if match.side_of(connection) != match.game.current_player:
+            raise ValueError("not your turn")
+        if not match.game.is_legal(position):
+            raise ValueError(f"illegal move {position!r}")
+        self.play(match, position)
+        self.request_ai_move(match)
+
+    def play(self, match, position):
+        player = match.game.current_player
+        if not match.game.apply(position):
+            raise ValueError(f"illegal move {position!r}")
+        match.broadcast({"type": "move", "player": player, "position": position})
+        if match.game.is_over:
+            self.finish(match, {"type": "over", "result": match.game.result})
+
+    def finish(self, match, message):
+        match.finished = True
+        self.games_finished += 1
+        match.broadcast(message)
+        for connection in match.players.values():
+            if connection is not None:
+                connection.match = None
+
+    def leave(self, connection):
+        """Forfeit the current game or stop waiting for an opponent"""
+        for key, waiting in list(self.waiting.items()):
+            if waiting is connection:
+                del self.waiting[key]
+        match = connection.match
+        if match is not None:
+            winner = other_player(match.side_of(connection))
+            self.finish(match, {"type": "over", "result": winner, "reason": "forfeit"})
+
+    def request_ai_move(self, match):
+        """Start the AI's search in the executor if it is the AI's turn"""
+        game = match.game
+        if game.is_over or match.players[game.current_player] is not None:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.executor, compute_ai_move, match.difficulty, game.to_list(),
+            game.current_player, game.k, self.ai_options)
+        future.add_done_callback(
+            lambda future: self.ai_move_done(match, len(game.moves), future))
+
+    def ai_move_done(self, match, moves_played, future):
+        # Ignore searches for games that ended or moved on in the meantime
+        if future.cancelled() or match.finished or len(match.game.moves) != moves_played:
+            return
+        if future.exception() is not None or not match.game.is_legal(future.result()):
+            self.finish(match, {"type": "over", "result": DRAW, "reason": "ai error"})
+            return
+        self.play(match, future.result())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tic Tac Toe game server")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--ai-workers", type=int, default=None,
+                        help="processes for AI moves (default: CPU count)")
+    parser.add_argument("--ai-time-budget", type=float, default=strategies.AI_TIME_BUDGET,
+                        help="seconds per AI move for time-limited strategies")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="outgoing messages buffered per client before it is dropped")
+    parser.add_argument("--tablebase", help="tablebase file for instant AI moves on its board")
+    args = parser.parse_args(argv)
+
+    raise_open_file_limit()
+    server = GameServer(args.ai_workers, args.ai_time_budget, args.queue_size, args.tablebase)
+    print(f"Listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
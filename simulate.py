@@ -0,0 +1,172 @@
+"""
+Headless AI-vs-AI self-play simulator
+
+Plays large numbers of games between any two registered strategies
+(see ``strategies.STRATEGIES``) with no printing, screen clearing or
+sleeping.  Searches get simulation limits instead of the interactive
+one-second budget: MCTS runs ``iterations`` iterations and any
+time-limited search stops after ``time_budget`` seconds, unless the
+strategy was registered with its own values (as ``mcts-500`` is).
+Games are split into chunks that run across a process pool; each chunk
+seeds its own random generators from the base seed, so a run is
+reproducible for a given seed and chunk size regardless of the number
+of workers, as long as no search is cut short by time_budget.
+
+    python simulate.py --x easy --o hard --games 100000 --workers 8
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import strategies
+from engine import Game
+from records import GameLogWriter
+
+ChunkResult = namedtuple("ChunkResult", ["games", "x_wins", "o_wins", "draws"])
+
+
+class SimulationResult(namedtuple("SimulationResult", ChunkResult._fields + ("elapsed",))):
+    """Aggregate win/draw counts of a simulation run"""
+
+    __slots__ = ()
+
+    @property
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+
+# Per-move search limits for simulated games
+ITERATIONS = 500
+TIME_BUDGET = 0.05
+
+# Game record writers of this process, by directory
+_LOG_WRITERS = {}
+
+
+def play_headless_game(x_difficulty, o_difficulty, rows=3, cols=3, k=None, record_dir=None,
+                       time_budget=TIME_BUDGET, iterations=ITERATIONS):
+    """Play one game and return the winner ("X", "O") or None for a draw
+
+    With record_dir, the game's moves are appended to a shard there (see
+    records.py).  time_budget and iterations limit each search move.
+    """
+    game = Game(rows, cols, k)
+    # Kept in step with the game so strategies need no fresh copy each move
+    board = game.to_list()
+    sides = {
+        "X": strategies.get_strategy(x_difficulty),
+        "O": strategies.get_strategy(o_difficulty),
+    }
+    while not game.is_over:
+        player = game.current_player
+        position = sides[player].move(board, player, k, lines=game.lines,
+                                      time_budget=time_budget, iterations=iterations)
+        if not game.apply(position):
+            raise ValueError(f"Strategy {sides[player].name!r} chose illegal move {position!r}")
+        row, col = divmod(position - 1, cols)
+        board[row][col] = player
+    if record_dir is not None:
+        writer = _LOG_WRITERS.get(record_dir)
+        if writer is None:
+            writer = _LOG_WRITERS[record_dir] = GameLogWriter(record_dir)
+        writer.write(game, x_difficulty, o_difficulty)
+    return game.winner
+
+
+def run_chunk(x_difficulty, o_difficulty, games, seed, rows=3, cols=3, k=None, record_dir=None,
+              time_budget=TIME_BUDGET, iterations=ITERATIONS):
+    """Play a chunk of games with generators seeded from seed"""
+    random.seed(seed)
+    strategies.MCTS_PLAYER.random.seed(seed)
+    strategies.MCTS_PLAYER.reset()
+    x_wins = o_wins = draws = 0
+    for _ in range(games):
+        winner = play_headless_game(x_difficulty, o_difficulty, rows, cols, k, record_dir,
+                                    time_budget, iterations)
+        if winner == "X":
+            x_wins += 1
+        elif winner == "O":
+            o_wins += 1
+        else:
+            draws += 1
+    return ChunkResult(games, x_wins, o_wins, draws)
+
+
+def _run_chunk(args):
+    return run_chunk(*args)
+
+
+def simulate(x_difficulty, o_difficulty, games, workers=None, chunk_size=1000, seed=0,
+             rows=3, cols=3, k=None, record_dir=None, time_budget=TIME_BUDGET,
+             iterations=ITERATIONS):
+    """Play games between two difficulties and return a SimulationResult
+
+    workers=1 plays every chunk in this process.
+    """
+    for difficulty in (x_difficulty, o_difficulty):
+        strategies.get_strategy(difficulty)  # Fail fast on unknown names
+    workers = workers or os.cpu_count() or 1
+    chunks = []
+    remaining = games
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append((x_difficulty, o_difficulty, size, seed + len(chunks), rows, cols, k,
+                       record_dir, time_budget, iterations))
+        remaining -= size
+
+    start = time.perf_counter()
+    if workers == 1:
+        totals = _sum_chunks(map(_run_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            totals = _sum_chunks(pool.map(_run_chunk, chunks))
+    return SimulationResult(*totals, elapsed=time.perf_counter() - start)
+
+
+def _sum_chunks(results):
+    games = x_wins = o_wins = draws = 0
+    for result in results:
+        games += result.games
+        x_wins += result.x_wins
+        o_wins += result.o_wins
+        draws += result.draws
+    return games, x_wins, o_wins, draws
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate AI-vs-AI Tic Tac Toe games")
+    parser.add_argument("--x", default="hard", choices=sorted(strategies.STRATEGIES),
+                        help="strategy playing X")
+    parser.add_argument("--o", default="hard", choices=sorted(strategies.STRATEGIES),
+                        help="strategy playing O")
+    parser.add_argument("--games", type=int, default=10000, help="number of games")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="games per worker task")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--rows", type=int, default=3, help="board rows")
+    parser.add_argument("--cols", type=int, default=3, help="board columns")
+    parser.add_argument("-k", type=int, default=None, help="marks in a row needed to win")
+    parser.add_argument("--record", metavar="DIR", default=None,
+                        help="append every game's moves to a games directory (see records.py)")
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET,
+                        help="seconds per move for time-limited searches")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS,
+                        help="MCTS iterations per move")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    result = simulate(args.x, args.o, args.games, args.workers, args.chunk_size, args.seed,
+                      args.rows, args.cols, args.k, args.record, args.time_budget,
+                      args.iterations)
+    print(f"{result.games} games in {result.elapsed:.2f}s ({result.games_per_second:.0f} games/s)")
+    for label, count in (("X wins", result.x_wins), ("O wins", result.o_wins), ("Draws", result.draws)):
+        print(f"  {label}: {count} ({count / result.games * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
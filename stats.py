@@ -0,0 +1,572 @@
+"""
+Game statistics storage, safe for many processes at once
+
+Statistics live in a base snapshot (``game_stats.json``, the statistics
+dict as JSON) plus a directory of shard journals (``game_stats.d/``).
+Every process appends the games it finishes to its own shard, one compact
+JSON line per game, so writers never share a file or a lock.  Loading
+merges the snapshot with every shard; totals stay exact however many
+processes write at once.
+
+Appends happen on a background writer thread, which writes whatever has
+queued up in one go, so finishing a game costs no disk I/O on the
+caller's thread.  Every ``compact_every`` games a writer folds its shard
+into the snapshot and starts a new shard.  That is the only step that
+takes the lock file, and it writes the snapshot to a temporary file and
+renames it into place, so a crash never leaves a truncated snapshot.  The
+snapshot records how far it has merged each shard, so a crash between the
+rename and deleting the shard does not count games twice.  Shards left by
+processes that exited without folding them are merged by the next writer
+that folds its own.
+"""
+
+import atexit
+import copy
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SNAPSHOT_PATH = "game_stats.json"
+SHARD_DIR = "game_stats.d"
+SHARD_SUFFIX = ".jsonl"
+LOCK_NAME = ".lock"
+
+# Games kept in the snapshot's game_history
+HISTORY_LENGTH = 50
+
+# Games a writer appends to its shard before folding it into the snapshot
+COMPACT_EVERY = 1000
+
+# Records the writer takes off the queue per write
+BATCH_SIZE = 512
+
+# Times load() rereads when the snapshot changes underneath it
+LOAD_RETRIES = 10
+
+# Seconds a StatsService goes without checking the files for outside changes
+CHECK_EVERY = 1.0
+
+HISTORY_FIELDS = ("timestamp", "mode", "winner", "ai_difficulty")
+
+
+def new_statistics():
+    """Return an empty statistics dict"""
+    return {
+        'total_games': 0,
+        'human_vs_human': {
+            'games': 0,
+            'player_x_wins': 0,
+            'player_o_wins': 0,
+            'draws': 0
+        },
+        'human_vs_ai': {
+            'games': 0,
+            'human_wins': 0,
+            'ai_wins': 0,
+            'draws': 0,
+            'difficulty_stats': {
+                'easy': {'games': 0, 'human_wins': 0, 'ai_wins': 0, 'draws': 0},
+                'medium': {'games': 0, 'human_wins': 0, 'ai_wins': 0, 'draws': 0},
+                'hard': {'games': 0, 'human_wins': 0, 'ai_wins': 0, 'draws': 0},
+                'mcts': {'games': 0, 'human_wins': 0, 'ai_wins': 0, 'draws': 0}
+            }
+        },
+        'game_history': [],
+        'shards': {}
+    }
+
+
+def game_record(game_mode, winner, ai_difficulty=None, timestamp=None):
+    """Return the record of one finished game"""
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        'timestamp': timestamp,
+        'mode': game_mode,
+        'winner': winner,
+        'ai_difficulty': ai_difficulty
+    }
+
+
+def apply_record(stats, record):
+    """Add one game record to a statistics dict"""
+    stats['total_games'] += 1
+
+    history = stats['game_history']
+    history.append({field: record.get(field) for field in HISTORY_FIELDS})
+    if len(history) > HISTORY_LENGTH:
+        del history[0]
+
+    winner = record['winner']
+    if record['mode'] == 'human_vs_human':
+        mode_stats = stats['human_vs_human']
+        mode_stats['games'] += 1
+        if winner == 'X':
+            mode_stats['player_x_wins'] += 1
+        elif winner == 'O':
+            mode_stats['player_o_wins'] += 1
+        else:  # Draw
+            mode_stats['draws'] += 1
+
+    elif record['mode'] == 'human_vs_ai':
+        mode_stats = stats['human_vs_ai']
+        mode_stats['games'] += 1
+        difficulty_stats = mode_stats['difficulty_stats'].setdefault(
+            record['ai_difficulty'], {'games': 0, 'human_wins': 0, 'ai_wins': 0, 'draws': 0})
+        difficulty_stats['games'] += 1
+
+        if winner == 'human':
+            mode_stats['human_wins'] += 1
+            difficulty_stats['human_wins'] += 1
+        elif winner == 'ai':
+            mode_stats['ai_wins'] += 1
+            difficulty_stats['ai_wins'] += 1
+        else:  # Draw
+            mode_stats['draws'] += 1
+            difficulty_stats['draws'] += 1
+
+
+def read_snapshot(path=SNAPSHOT_PATH, quarantine=False):
+    """Load a snapshot, or empty statistics if there is none or it is corrupt
+
+    With quarantine, a snapshot that cannot be parsed is renamed aside
+    rather than silently overwritten later.  Only a writer holding the
+    lock should pass it; readers leave the files alone.
+    """
+    try:
+        with open(path, 'r') as f:
+            stats = json.load(f)
+    except FileNotFoundError:
+        return new_statistics()
+    except json.JSONDecodeError:
+        if quarantine:
+            os.replace(path, f"{path}.corrupt-{int(time.time())}")
+        return new_statistics()
+    stats.setdefault('shards', {})
+    stats.pop('last_sequence', None)
+    return stats
+
+
+def write_snapshot(stats, path=SNAPSHOT_PATH):
+    """Write a snapshot atomically: to a temporary file, then rename it over path"""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(stats, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def read_journal(path):
+    """Yield the records in a journal, skipping a torn final line"""
+    try:
+        f = open(path, 'r')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def shard_names(shard_dir=SHARD_DIR):
+    try:
+        return sorted(name[:-len(SHARD_SUFFIX)] for name in os.listdir(shard_dir)
+                      if name.endswith(SHARD_SUFFIX))
+    except FileNotFoundError:
+        return []
+
+
+def merge_shards(stats, shard_dir=SHARD_DIR):
+    """Apply every shard record the snapshot has not merged yet
+
+    Returns {shard: last sequence number seen}.
+    """
+    merged = stats['shards']
+    seen = {}
+    for name in shard_names(shard_dir):
+        done = merged.get(name, 0)
+        last = done
+        for record in read_journal(os.path.join(shard_dir, name + SHARD_SUFFIX)):
+            if record.get('seq', 0) > done:
+                apply_record(stats, record)
+                last = max(last, record['seq'])
+        seen[name] = last
+    # Shards interleave in time, so restore the history's order
+    stats['game_history'].sort(key=lambda game: game['timestamp'] or '')
+    del stats['game_history'][:-HISTORY_LENGTH]
+    return seen
+
+
+def _file_identity(path):
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return status.st_ino, status.st_mtime_ns, status.st_size
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if not f.tell():
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def _lock(f, exclusive=True, blocking=True):
+    """Lock an open file; return False if blocking is off and it is held"""
+    if fcntl is None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        return True
+    flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    try:
+        fcntl.flock(f.fileno(), flags if blocking else flags | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock(f):
+    if fcntl is None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _is_abandoned(path):
+    """True if no live process holds the shard open for writing"""
+    if fcntl is None:
+        return False  # Without flock, only a shard's owner removes it
+    try:
+        with open(path, 'a') as f:
+            return _lock(f, blocking=False)
+    except FileNotFoundError:
+        return False
+
+
+class StatsJournal:
+    """Statistics snapshot plus this process's shard journal and its writer thread"""
+
+    def __init__(self, snapshot_path=SNAPSHOT_PATH, shard_dir=SHARD_DIR,
+                 compact_every=COMPACT_EVERY, fsync=False):
+        self.snapshot_path = snapshot_path
+        self.shard_dir = shard_dir
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.queue = queue.Queue()
+        self.thread = None
+        # The shard this process is currently appending to
+        self.shard_name = None
+        self.errors = []
+        atexit.register(self.close)
+
+    def load(self):
+        """Return the merged statistics of the snapshot and every shard"""
+        for _ in range(LOAD_RETRIES):
+            before = _file_identity(self.snapshot_path)
+            stats = read_snapshot(self.snapshot_path)
+            merge_shards(stats, self.shard_dir)
+            # A writer folded shards meanwhile; read the new snapshot instead
+            if _file_identity(self.snapshot_path) == before:
+                break
+        del stats['shards']
+        return stats
+
+    def append(self, record):
+        """Queue a game record for the writer thread"""
+        self._start()
+        self.queue.put(('record', record))
+
+    def save(self, stats):
+        """Queue a full replacement of the statistics, superseding every shard so far"""
+        self._start()
+        self.queue.put(('snapshot', copy.deepcopy(stats)))
+
+    def flush(self):
+        """Block until everything queued so far is on disk"""
+        if self.thread is not None:
+            self.queue.join()
+
+    def close(self):
+        """Write everything queued, fold the shard into the snapshot and stop the writer"""
+        if self.thread is not None:
+            self.queue.put(('stop', None))
+            self.thread.join()
+            self.thread = None
+
+    def _start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+            self.thread.start()
+
+    def _new_shard(self):
+        """Open a fresh shard for this process, locked for as long as it is open"""
+        os.makedirs(self.shard_dir, exist_ok=True)
+        name = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.shard_dir, name + SHARD_SUFFIX)
+        # Lock before the shard becomes visible, so it never looks abandoned
+        shard = open(path + ".new", 'a')
+        if fcntl is not None:
+            _lock(shard, exclusive=False)
+        os.replace(path + ".new", path)
+        self.shard_name = name
+        return name, shard
+
+    def _run(self):
+        try:
+            name, shard = self._new_shard()
+        except OSError as e:
+            self.errors.append(e)
+            name, shard = None, None
+        sequence = pending = 0
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Decided up front so a failure below cannot lose the stop
+            stopping = any(kind == 'stop' for kind, _ in batch)
+            try:
+                lines = []
+                for kind, payload in batch:
+                    if kind == 'record':
+                        try:
+                            line = json.dumps(dict(payload, seq=sequence + 1), separators=(',', ':'))
+                        except (TypeError, ValueError) as e:
+                            self.errors.append(e)
+                            continue
+                        sequence += 1
+                        lines.append(line + '\n')
+                        pending += 1
+                    elif kind == 'snapshot':
+                        # Records queued before the replacement are part of it
+                        self._write_lines(shard, lines)
+                        lines = []
+                        self._fold(payload)
+                self._write_lines(shard, lines)
+                if pending >= self.compact_every or (stopping and pending):
+                    if self._fold() and shard is not None:
+                        shard.close()
+                        self._remove(name)
+                        name, shard = None, None
+                        sequence = 0
+                        if not stopping:
+                            name, shard = self._new_shard()
+                    pending = 0
+            except Exception as e:
+                # Keep the writer alive: flush() and close() wait on it
+                self.errors.append(e)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        if shard is not None:
+            shard.close()
+            if not sequence:
+                self._remove(name)
+
+    def _write_lines(self, shard, lines):
+        if not lines or shard is None:
+            return
+        try:
+            shard.write(''.join(lines))
+            shard.flush()
+            if self.fsync:
+                os.fsync(shard.fileno())
+        except OSError as e:
+            self.errors.append(e)
+
+    def _fold(self, replacement=None):
+        """Merge every shard into the snapshot under the lock file
+
+        With replacement, the snapshot becomes replacement and every
+        record written so far counts as merged.  Abandoned shards are
+        deleted.  Returns False if the snapshot could not be written.
+        """
+        try:
+            os.makedirs(self.shard_dir, exist_ok=True)
+            with open(os.path.join(self.shard_dir, LOCK_NAME), 'a') as lock:
+                _lock(lock)
+                try:
+                    stats = read_snapshot(self.snapshot_path, quarantine=True)
+                    seen = merge_shards(stats, self.shard_dir)
+                    if replacement is not None:
+                        stats = replacement
+                        stats.pop('last_sequence', None)
+                    # Forget shards whose files were deleted after an earlier fold
+                    stats['shards'] = seen
+                    write_snapshot(stats, self.snapshot_path)
+                    for name in seen:
+                        path = os.path.join(self.shard_dir, name + SHARD_SUFFIX)
+                        if _is_abandoned(path):
+                            os.remove(path)
+                finally:
+                    _unlock(lock)
+        except OSError as e:
+            # Every record is still in a shard, so nothing is lost
+            self.errors.append(e)
+            return False
+        return True
+
+    def _remove(self, name):
+        try:
+            os.remove(os.path.join(self.shard_dir, name + SHARD_SUFFIX))
+        except OSError:
+            pass
+
+
+class StatsService:
+    """Statistics kept in memory, updated per game and reloaded only on outside changes
+
+    Recording a game updates the totals and the rolling window in O(1) and
+    queues it for the journal.  Reads first compare the size and mtime of
+    the snapshot and of other processes' shards with those seen at the
+    last load, and only reread the files when something changed.  That
+    check runs at most once every check_every seconds, so games finished
+    by other processes can take that long to show up.
+
+    With persist_every (seconds), recorded games are held in memory and
+    handed to the journal at most that often, and at exit, instead of one
+    by one; other processes see them only once they are persisted.
+    """
+
+    def __init__(self, journal=None, window=HISTORY_LENGTH, persist_every=None,
+                 check_every=CHECK_EVERY):
+        self.journal = journal if journal is not None else StatsJournal()
+        self.window = window
+        self.persist_every = persist_every
+        self.check_every = check_every
+        self._stats = None
+        self._signature = None
+        self._checked_at = None
+        self._recent = deque()
+        self._recent_counts = Counter()
+        # Games recorded but not yet given to the journal
+        self._unsaved = []
+        self._persisted_at = time.monotonic()
+        # Registered after the journal's close, so it runs before it
+        atexit.register(self.persist)
+
+    @property
+    def stats(self):
+        """The current statistics dict; treat it as read-only"""
+        self.refresh()
+        return self._stats
+
+    def refresh(self, force=False):
+        """Reload if the files changed since the last load; return True if reloaded
+
+        Unless force is set, the files are only looked at once every
+        check_every seconds.
+        """
+        now = time.monotonic()
+        if (self._stats is not None and not force and self._checked_at is not None
+                and now - self._checked_at < self.check_every):
+            return False
+        self._checked_at = now
+        signature = self._file_signature()
+        if self._stats is not None and signature == self._signature:
+            return False
+        # Our own queued games must be on disk before rereading
+        self.journal.flush()
+        signature = self._file_signature()
+        self._stats = self.journal.load()
+        self._signature = signature
+        for record in self._unsaved:
+            apply_record(self._stats, record)
+        self._recent.clear()
+        self._recent_counts.clear()
+        for game in self._stats['game_history'][-self.window:]:
+            self._push_recent(game['mode'], game['winner'])
+        return True
+
+    def record(self, game_mode, winner, ai_difficulty=None):
+        """Add a finished game and return its record"""
+        self.refresh()
+        record = game_record(game_mode, winner, ai_difficulty)
+        apply_record(self._stats, record)
+        self._push_recent(game_mode, winner)
+        if self.persist_every is None:
+            self.journal.append(record)
+        else:
+            self._unsaved.append(record)
+            if time.monotonic() - self._persisted_at >= self.persist_every:
+                self.persist()
+        return record
+
+    def persist(self):
+        """Hand every game recorded since the last persist to the journal"""
+        for record in self._unsaved:
+            self.journal.append(record)
+        self._unsaved.clear()
+        self._persisted_at = time.monotonic()
+
+    def save(self, stats):
+        """Replace the saved statistics with stats"""
+        # stats supersedes any games not yet persisted
+        self._unsaved.clear()
+        self.journal.save(stats)
+        self.journal.flush()
+        self._stats = None
+
+    def rate(self, mode, outcome, difficulty=None):
+        """Percentage of all games in mode (and difficulty) counted under outcome
+
+        outcome is a counter name such as 'human_wins' or 'draws'.
+        """
+        counts = self.stats[mode]
+        if difficulty is not None:
+            counts = counts['difficulty_stats'].get(difficulty, {})
+        games = counts.get('games', 0)
+        return counts.get(outcome, 0) / games * 100 if games else 0.0
+
+    def recent_rate(self, mode, winner):
+        """Percentage of the last window games in mode won by winner ('draw' for draws)"""
+        self.refresh()
+        games = self._recent_counts[mode]
+        return self._recent_counts[mode, winner] / games * 100 if games else 0.0
+
+    def recent_games(self, mode):
+        """How many of the last window games were played in mode"""
+        self.refresh()
+        return self._recent_counts[mode]
+
+    def _push_recent(self, mode, winner):
+        if self.window <= 0:
+            return
+        if len(self._recent) == self.window:
+            old_mode, old_winner = self._recent.popleft()
+            self._recent_counts[old_mode] -= 1
+            self._recent_counts[old_mode, old_winner] -= 1
+        self._recent.append((mode, winner))
+        self._recent_counts[mode] += 1
+        self._recent_counts[mode, winner] += 1
+
+    def _file_signature(self):
+        """Size and mtime of the snapshot and of every shard but our own"""
+        own = self.journal.shard_name
+        shards = tuple(
+            (name, _file_identity(os.path.join(self.journal.shard_dir, name + SHARD_SUFFIX)))
+            for name in shard_names(self.journal.shard_dir) if name != own
+        )
+        return _file_identity(self.journal.snapshot_path), shards
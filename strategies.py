@@ -0,0 +1,204 @@
+"""
+AI strategies and the registry that names them
+
+A strategy is a function ``function(board, ai_player, k, **params)`` that
+returns the 1-based position to play on ``board``, a list of rows.  Each
+is registered in ``STRATEGIES`` under a name, with fixed params, and
+looked up with ``get_strategy``.  The terminal game, the GUI, the engine,
+the server and the simulators all dispatch through this registry, which
+does no printing or input.
+"""
+
+import inspect
+import random
+
+from bitboard import FULL_MASK, MASK_POSITIONS, TranspositionTable, board_masks, best_move
+from mcts import MonteCarloTreeSearch
+from mnk import EMPTY, LineIndex, MNKBoard
+from parallel import get_parallel_search
+from search import AlphaBetaSearch
+from tablebase import Tablebase, side_to_move
+
+# Seconds the AI takes per move: the search deadline on large boards and
+# the pacing delay for faster strategies
+AI_TIME_BUDGET = 1.0
+
+
+def is_classic_board(board, k=None):
+    """Return True for a 3x3 three-in-a-row board, which uses the bitboard core"""
+    return len(board) == 3 and len(board[0]) == 3 and k in (None, 3)
+
+
+def get_available_positions(board):
+    """Get all available positions on the board"""
+    if not is_classic_board(board):
+        cols = len(board[0])
+        return [row * cols + col + 1
+                for row, cells in enumerate(board)
+                for col, cell in enumerate(cells) if cell == EMPTY]
+    x_mask, o_mask = board_masks(board)
+    return list(MASK_POSITIONS[FULL_MASK & ~(x_mask | o_mask)])
+
+
+def ai_easy_move(board, ai_player=None, k=None):
+    """Easy AI: Makes random moves"""
+    available_positions = get_available_positions(board)
+    if available_positions:
+        return random.choice(available_positions)
+    return None
+
+
+def ai_medium_move(board, ai_player, k=None, forks=False, lines=None):
+    """Medium AI: Blocks player wins and tries to win
+
+    With forks, it also makes a fork (two winning threats at once) when it
+    can, and otherwise takes the cell where the opponent could fork.
+    lines is the game's LineIndex for board; without it one is built.
+    """
+    available_positions = get_available_positions(board)
+    if not available_positions:
+        return None
+    if lines is None:
+        lines = LineIndex.from_list(board, k)
+
+    # First, try to win
+    wins = lines.winning_cells(ai_player)
+    if wins:
+        return min(wins) + 1
+
+    # Second, block opponent from winning
+    opponent = "X" if ai_player == "O" else "O"
+    blocks = lines.winning_cells(opponent)
+    if blocks:
+        return min(blocks) + 1
+
+    # Then make a fork, or block the opponent's
+    if forks:
+        moves = [position - 1 for position in available_positions]
+        for player in (ai_player, opponent):
+            cells = lines.forks(player, moves)
+            if cells:
+                return min(cells) + 1
+
+    # Otherwise, make a random move
+    return random.choice(available_positions)
+
+
+# Minimax scores shared by every hard AI move in this process
+HARD_AI_TABLE = TranspositionTable(max_size=4096)
+
+# Precomputed solutions loaded with load_tablebase, answered before any search
+HARD_AI_TABLEBASE = None
+
+
+def load_tablebase(path):
+    """Use a tablebase file (see tablebase.py) for hard AI moves on its board"""
+    global HARD_AI_TABLEBASE
+    if HARD_AI_TABLEBASE is not None:
+        HARD_AI_TABLEBASE.close()
+    HARD_AI_TABLEBASE = Tablebase(path)
+    return HARD_AI_TABLEBASE
+
+
+def ai_hard_move(board, ai_player, k=None, time_budget=AI_TIME_BUDGET, workers=None):
+    """Hard AI: Uses minimax algorithm for optimal play
+
+    Classic 3x3 boards are solved exactly; larger boards use an alpha-beta
+    search that returns its best move when time_budget runs out, spread
+    over a pool of worker processes when workers is more than 1.  A loaded
+    tablebase for the board answers with a single indexed read.
+    """
+    tablebase = HARD_AI_TABLEBASE
+    if tablebase is not None:
+        rows, cols = len(board), len(board[0])
+        if tablebase.matches(rows, cols, min(rows, cols) if k is None else k):
+            cells = [cell for row in board for cell in row]
+            if side_to_move(cells) == ai_player:
+                index = tablebase.best_move(cells)
+                if index is not None:
+                    return index + 1
+    if not is_classic_board(board, k):
+        mnk_board = MNKBoard.from_list(board, k)
+        if workers and workers > 1:
+            result = get_parallel_search(workers).search(mnk_board, ai_player, time_budget)
+        else:
+            result = AlphaBetaSearch(time_budget).search(mnk_board, ai_player)
+        return None if result.move is None else result.move + 1
+    x_mask, o_mask = board_masks(board)
+    if ai_player == "X":
+        best_position, _ = best_move(x_mask, o_mask, HARD_AI_TABLE)
+    else:
+        best_position, _ = best_move(o_mask, x_mask, HARD_AI_TABLE)
+    return best_position
+
+
+# Kept between moves so the tree built for one move is reused for the next
+MCTS_PLAYER = MonteCarloTreeSearch()
+
+
+def ai_mcts_move(board, ai_player, k=None, time_budget=AI_TIME_BUDGET, iterations=None):
+    """Expert AI: Monte Carlo Tree Search within a time or iteration budget"""
+    MCTS_PLAYER.time_budget = time_budget
+    MCTS_PLAYER.iterations = iterations
+    index = MCTS_PLAYER.search(MNKBoard.from_list(board, k), ai_player)
+    return None if index is None else index + 1
+
+
+# Strategy registry: every AI the game can dispatch to, by name
+
+
+class Strategy:
+    """An AI move function registered under a name with fixed parameters"""
+
+    def __init__(self, name, function, description="", params=None):
+        self.name = name
+        self.function = function
+        self.description = description
+        self.params = params or {}
+        # Keyword arguments the function accepts, so callers can pass
+        # options like time_budget that only some strategies use
+        self.options = set(inspect.signature(function).parameters)
+
+    def move(self, board, ai_player, k=None, **options):
+        """Return the position (1-based) this strategy plays on board
+
+        Options the function does not accept are dropped, and the
+        registered params take precedence over options of the same name.
+        """
+        kwargs = {name: value for name, value in options.items() if name in self.options}
+        kwargs.update(self.params)
+        return self.function(board, ai_player, k, **kwargs)
+
+
+STRATEGIES = {}
+
+
+def register_strategy(name, function=None, description="", **params):
+    """Register function(board, ai_player, k, **params) as a named strategy
+
+    Can be called directly or used as a decorator.
+    """
+    def register(function):
+        STRATEGIES[name] = Strategy(name, function, description, params)
+        return function
+    if function is None:
+        return register
+    return register(function)
+
+
+def get_strategy(name):
+    """Look up a registered strategy by name"""
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy: {name}") from None
+
+
+register_strategy("easy", ai_easy_move, "Random moves")
+register_strategy("medium", ai_medium_move, "Wins and blocks, otherwise random")
+register_strategy("medium-forks", ai_medium_move,
+                  "Wins, blocks, makes and blocks forks, otherwise random", forks=True)
+register_strategy("hard", ai_hard_move, "Minimax/alpha-beta search")
+register_strategy("mcts", ai_mcts_move, "Monte Carlo Tree Search, time budget")
+register_strategy("mcts-500", ai_mcts_move, "Monte Carlo Tree Search, 500 iterations",
+                  time_budget=None, iterations=500)
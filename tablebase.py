@@ -0,0 +1,259 @@
+"""
+Tablebase generator and memory-mapped reader for small m,n,k boards
+
+Every reachable position of a board up to 4x4 is solved once by
+retrograde analysis: positions are enumerated forward layer by layer
+(one layer per number of marks) and then valued backward from the full
+board, so each position is scored from its already-solved successors.
+
+The result is a compact binary file:
+
+    header   struct HEADER_FORMAT (magic, version, rows, cols, k, entry size)
+    entries  one byte per base-3 position index (cell i contributes
+             0, 1 or 2 times 3**i for empty, X or O)
+
+Each entry byte holds the outcome for the side to move in the top two
+bits (see the OUTCOME_* constants) and the best move + 1 in the low six
+bits (0 when the position is terminal).  Readers ``mmap`` the file and do
+a single indexed read per lookup, so nothing is parsed at startup and all
+processes share one copy through the page cache.
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+import time
+
+from mnk import get_geometry
+
+MAGIC = b"TTTB"
+VERSION = 1
+HEADER_FORMAT = "<4sHBBBB"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_SIZE = 1
+
+# Largest board the generator supports: 3**16 one-byte entries (43 MB)
+MAX_CELLS = 16
+
+OUTCOME_UNREACHABLE = 0
+OUTCOME_WIN = 1
+OUTCOME_LOSS = 2
+OUTCOME_DRAW = 3
+
+OUTCOME_NAMES = {
+    OUTCOME_UNREACHABLE: "unreachable",
+    OUTCOME_WIN: "win",
+    OUTCOME_LOSS: "loss",
+    OUTCOME_DRAW: "draw",
+}
+
+
+class TablebaseError(Exception):
+    """Raised for unsupported boards and malformed tablebase files"""
+
+
+def _ternary_tables(size):
+    """Byte-chunk lookups converting a cell mask to its base-3 weight"""
+    tables = []
+    for shift in range(0, size, 8):
+        tables.append(tuple(
+            sum(3 ** (shift + bit) for bit in range(8) if byte & (1 << bit) and shift + bit < size)
+            for byte in range(256)
+        ))
+    return tables
+
+
+def _ternary(mask, tables):
+    index = 0
+    for table in tables:
+        index += table[mask & 0xFF]
+        mask >>= 8
+    return index
+
+
+def generate(rows, cols, k=None, progress=None):
+    """Solve every reachable position and return the entry table as bytes
+
+    progress, if given, is called with (layer, positions) as layers finish.
+    """
+    geometry = get_geometry(rows, cols, k if k is not None else min(rows, cols))
+    size = geometry.size
+    if size > MAX_CELLS:
+        raise TablebaseError(f"Boards larger than {MAX_CELLS} cells are not supported")
+    full = (1 << size) - 1
+    line_masks = [sum(1 << index for index in line) for line in geometry.lines]
+    winning = bytearray(1 << size)
+    for mask in range(1 << size):
+        for line in line_masks:
+            if mask & line == line:
+                winning[mask] = 1
+                break
+    tables = _ternary_tables(size)
+    cell_bits = [1 << index for index in range(size)]
+
+    # Forward pass: layer n holds the positions with n marks, keyed as
+    # x_mask | o_mask << size; terminal positions are not expanded
+    layers = [{0}]
+    for marks in range(size):
+        next_layer = set()
+        x_to_move = marks % 2 == 0
+        for key in layers[marks]:
+            x_mask = key & full
+            o_mask = key >> size
+            if winning[x_mask] or winning[o_mask]:
+                continue
+            empty = full & ~(x_mask | o_mask)
+            while empty:
+                bit = empty & -empty
+                empty ^= bit
+                if x_to_move:
+                    next_layer.add(key | bit)
+                else:
+                    next_layer.add(key | (bit << size))
+        layers.append(next_layer)
+        if progress:
+            progress(marks + 1, len(next_layer))
+
+    # Backward pass: score each layer from the one after it.  Scores use
+    # the bitboard solver's convention: a loss for the side to move is
+    # -(size + 1) and scores shrink toward zero by one per ply, so the
+    # best move wins fastest or loses slowest
+    loss_score = -(size + 1)
+    entries = bytearray(3 ** size)
+    next_scores = {}
+    for marks in range(size, -1, -1):
+        scores = {}
+        x_to_move = marks % 2 == 0
+        for key in layers[marks]:
+            x_mask = key & full
+            o_mask = key >> size
+            index = _ternary(x_mask, tables) + 2 * _ternary(o_mask, tables)
+            mover_won = winning[x_mask] if not x_to_move else winning[o_mask]
+            if mover_won:
+                scores[key] = loss_score
+                entries[index] = OUTCOME_LOSS << 6
+                continue
+            if x_mask | o_mask == full:
+                scores[key] = 0
+                entries[index] = OUTCOME_DRAW << 6
+                continue
+            best_score = loss_score - 1
+            best_cell = None
+            for cell in range(size):
+                bit = cell_bits[cell]
+                if (x_mask | o_mask) & bit:
+                    continue
+                child = key | bit if x_to_move else key | (bit << size)
+                score = -next_scores[child]
+                if score > best_score:
+                    best_score = score
+                    best_cell = cell
+            if best_score > 0:
+                best_score -= 1
+                outcome = OUTCOME_WIN
+            elif best_score < 0:
+                best_score += 1
+                outcome = OUTCOME_LOSS
+            else:
+                outcome = OUTCOME_DRAW
+            scores[key] = best_score
+            entries[index] = (outcome << 6) | (best_cell + 1)
+        next_scores = scores
+        layers[marks] = None  # Free the layer once it has been scored
+    return bytes(entries)
+
+
+def write_tablebase(path, rows, cols, k=None, progress=None):
+    """Generate the tablebase for a board and write it to path"""
+    if k is None:
+        k = min(rows, cols)
+    entries = generate(rows, cols, k, progress)
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, rows, cols, k, ENTRY_SIZE))
+        f.write(entries)
+
+
+class Tablebase:
+    """Read-only, memory-mapped view of a tablebase file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER_SIZE:
+            self.map.close()
+            raise TablebaseError(f"{path} is too short to be a tablebase")
+        magic, version, self.rows, self.cols, self.k, entry_size = struct.unpack_from(
+            HEADER_FORMAT, self.map)
+        size = self.rows * self.cols
+        if magic != MAGIC or version != VERSION or entry_size != ENTRY_SIZE:
+            self.map.close()
+            raise TablebaseError(f"{path} is not a version {VERSION} tablebase")
+        if len(self.map) != HEADER_SIZE + 3 ** size * ENTRY_SIZE:
+            self.map.close()
+            raise TablebaseError(f"{path} is truncated")
+        self.powers = tuple(3 ** index for index in range(size))
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def matches(self, rows, cols, k):
+        return (self.rows, self.cols, self.k) == (rows, cols, k)
+
+    def index(self, cells):
+        """Base-3 position index of a flat list of cells"""
+        index = 0
+        for power, cell in zip(self.powers, cells):
+            if cell == "X":
+                index += power
+            elif cell == "O":
+                index += power + power
+        return index
+
+    def probe(self, cells):
+        """Return (outcome, best_move_index_or_None) for the side to move"""
+        entry = self.map[HEADER_SIZE + self.index(cells)]
+        move = entry & 0x3F
+        return entry >> 6, move - 1 if move else None
+
+    def best_move(self, cells):
+        """Best move index for the side to move, or None"""
+        return self.probe(cells)[1]
+
+
+def side_to_move(cells):
+    """X moves whenever both players have placed the same number of marks"""
+    x_count = sum(1 for cell in cells if cell == "X")
+    o_count = sum(1 for cell in cells if cell == "O")
+    return "X" if x_count == o_count else "O"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a Tic Tac Toe tablebase")
+    parser.add_argument("--rows", type=int, default=3, help="board rows")
+    parser.add_argument("--cols", type=int, default=3, help="board columns")
+    parser.add_argument("-k", type=int, default=None, help="marks in a row needed to win")
+    parser.add_argument("-o", "--output", required=True, help="tablebase file to write")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def progress(layer, positions):
+        print(f"  layer {layer}: {positions} positions", file=sys.stderr)
+
+    try:
+        write_tablebase(args.output, args.rows, args.cols, args.k, progress)
+    except TablebaseError as e:
+        parser.error(str(e))
+    print(f"Wrote {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,132 @@
 """
 Tic Tac Toe GUI Game using Tkinter
 A simple graphical version of the classic game
+
+Against the AI, moves are searched in a worker process.  Requests and
+results travel through queues, and the window checks for a result with
+after() every POLL_MS.  A search is never run inside a Tk callback, so
+the window keeps redrawing and responding during long searches on big
+boards.  New Game stops a search that is still running.
 """
 
+import multiprocessing
+import queue
 import tkinter as tk
 from tkinter import messagebox
 import random
 
-class TicTacToeGUI:
+import strategies
+from engine import Game
+
+# How often the window checks for the AI's move, in milliseconds (~60 fps)
+POLL_MS = 16
+
+HUMAN = "Human"
+
+# Cell size in pixels: the board gets about BOARD_PIXELS, within these limits
+BOARD_PIXELS = 600
+MIN_CELL = 28
+MAX_CELL = 90
+MARGIN = 4
+
+
+def _ai_worker(requests, results):
+    """Worker process: answer (search id, strategy, board, player, k) requests until None"""
+    for search_id, difficulty, board, player, k in iter(requests.get, None):
+        try:
+            position = strategies.get_strategy(difficulty).move(board, player, k)
+        except Exception as error:
+            results.put((search_id, None, repr(error)))
+        else:
+            results.put((search_id, position, None))
+
+
+class AIWorker:
+    """A process that computes AI moves, started on first use
+
+    Searches are numbered so the window can tell a current result from
+    one for a position it has left.  cancel() stops a running search by
+    ending the process; the next request starts a fresh one.
+    """
+
     def __init__(self):
+        self.process = None
+        self.requests = None
+        self.results = None
+        self.pending = None
+
+    def submit(self, search_id, difficulty, board, player, k=None):
+        if self.process is None:
+            self.requests = multiprocessing.Queue()
+            self.results = multiprocessing.Queue()
+            self.process = multiprocessing.Process(
+                target=_ai_worker, args=(self.requests, self.results), daemon=True)
+            self.process.start()
+        self.pending = search_id
+        self.requests.put((search_id, difficulty, board, player, k))
+
+    def poll(self):
+        """Return (search id, position, error) for a finished search, or None"""
+        if self.pending is None:
+            return None
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            if not self.process.is_alive():
+                self.process = None
+                result = (self.pending, None, "AI worker stopped")
+            else:
+                return None
+        if result[0] == self.pending:
+            self.pending = None
+        return result
+
+    def cancel(self):
+        """Abandon the running search, if any"""
+        if self.pending is None:
+            return
+        # The queues may be mid-transfer, so they go with the process
+        self.process.terminate()
+        self.process.join()
+        self.process = self.requests = self.results = None
+        self.pending = None
+
+    def close(self):
+        if self.process is None:
+            return
+        if self.pending is not None:
+            self.process.terminate()
+        else:
+            self.requests.put(None)
+        self.process.join(timeout=1)
+        self.process = None
+
+class TicTacToeGUI:
+    def __init__(self, rows=3, cols=3, k=None, opponent=HUMAN, ai_side="O"):
         self.window = tk.Tk()
         self.window.title("Tic Tac Toe")
-        self.window.geometry("400x500")
+        if (rows, cols) == (3, 3):
+            self.window.geometry("400x500")
         self.window.resizable(False, False)
         
         # Game state
-        self.current_player = "X"
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
-        self.game_over = False
-        self.buttons = []
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.game = Game(rows, cols, k)
+        self.cell = max(MIN_CELL, min(MAX_CELL, BOARD_PIXELS // max(rows, cols)))
+        
+        # AI opponent: a strategy name, or HUMAN for two players
+        self.opponent = tk.StringVar(value=opponent)
+        self.ai_difficulty = None if opponent == HUMAN else opponent
+        self.ai_side = ai_side
+        self.ai = AIWorker()
+        self.search_id = 0
+        self.poll_job = None
         
         self.setup_ui()
+        self.window.protocol("WM_DELETE_WINDOW", self.quit)
+        self.start_ai_turn()
         
     def setup_ui(self):
         # Title
@@ -36,34 +142,35 @@ class TicTacToeGUI:
         # Current player display
         self.status_label = tk.Label(
             self.window,
-            text=f"Player {self.current_player}'s turn",
+            text=f"Player {self.game.current_player}'s turn",
             font=("Arial", 16),
             fg="green"
         )
         self.status_label.pack(pady=5)
         
-        # Game board frame
-        board_frame = tk.Frame(self.window)
-        board_frame.pack(pady=20)
-        
-        # Create 3x3 grid of buttons
-        for row in range(3):
-            button_row = []
-            for col in range(3):
-                button = tk.Button(
-                    board_frame,
-                    text=" ",
-                    font=("Arial", 20, "bold"),
-                    width=4,
-                    height=2,
-                    command=lambda r=row, c=col: self.make_move(r, c),
-                    bg="lightgray",
-                    relief="raised",
-                    bd=2
-                )
-                button.grid(row=row, column=col, padx=2, pady=2)
-                button_row.append(button)
-            self.buttons.append(button_row)
+        # Game board: one canvas with the grid drawn once and a text item
+        # per mark, so the widget count does not grow with the board
+        width = self.cols * self.cell
+        height = self.rows * self.cell
+        self.canvas = tk.Canvas(
+            self.window,
+            width=width + 2 * MARGIN,
+            height=height + 2 * MARGIN,
+            bg="white",
+            highlightthickness=0
+        )
+        self.canvas.pack(pady=20)
+        self.canvas.create_rectangle(
+            MARGIN, MARGIN, MARGIN + width, MARGIN + height, fill="lightgray", outline="gray"
+        )
+        for col in range(1, self.cols):
+            x = MARGIN + col * self.cell
+            self.canvas.create_line(x, MARGIN, x, MARGIN + height, fill="gray", width=2)
+        for row in range(1, self.rows):
+            y = MARGIN + row * self.cell
+            self.canvas.create_line(MARGIN, y, MARGIN + width, y, fill="gray", width=2)
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.mark_font = ("Arial", max(10, int(self.cell * 0.45)), "bold")
         
         # Control buttons frame
         control_frame = tk.Frame(self.window)
@@ -80,100 +187,142 @@ class TicTacToeGUI:
         )
         new_game_btn.pack(side=tk.LEFT, padx=10)
         
+        # Opponent for the next game
+        opponent_menu = tk.OptionMenu(
+            control_frame,
+            self.opponent,
+            HUMAN,
+            *strategies.STRATEGIES
+        )
+        opponent_menu.pack(side=tk.LEFT, padx=10)
+        
         # Quit button
         quit_btn = tk.Button(
             control_frame,
             text="Quit",
             font=("Arial", 14),
-            command=self.window.quit,
+            command=self.quit,
             bg="lightcoral",
             padx=20
         )
         quit_btn.pack(side=tk.LEFT, padx=10)
         
+    def on_click(self, event):
+        col = (event.x - MARGIN) // self.cell
+        row = (event.y - MARGIN) // self.cell
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            self.make_move(row, col)
+    
     def make_move(self, row, col):
-        if self.game_over or self.board[row][col] != " ":
+        # The board is the AI's while it is thinking
+        if self.is_ai_turn():
+            return
+        self.play(row * self.cols + col + 1)
+        self.start_ai_turn()
+    
+    def play(self, position):
+        """Play position for the side to move and update the window"""
+        player = self.game.current_player
+        if not self.game.apply(position):
             return
+        row, col = divmod(position - 1, self.cols)
             
-        # Make the move
-        self.board[row][col] = self.current_player
-        self.buttons[row][col].config(
-            text=self.current_player,
-            fg="red" if self.current_player == "X" else "blue",
-            state="disabled"
+        self.canvas.create_text(
+            MARGIN + (col + 0.5) * self.cell,
+            MARGIN + (row + 0.5) * self.cell,
+            text=player,
+            fill="red" if player == "X" else "blue",
+            font=self.mark_font,
+            tags=("mark",)
         )
         
         # Check for win or draw
-        if self.check_winner(self.current_player):
-            self.game_over = True
+        if self.game.winner:
             self.status_label.config(
-                text=f"Player {self.current_player} wins! 🎉",
+                text=f"Player {player} wins! 🎉",
                 fg="purple"
             )
-            messagebox.showinfo("Game Over", f"Player {self.current_player} wins!")
-            self.disable_all_buttons()
-        elif self.is_draw():
-            self.game_over = True
+            messagebox.showinfo("Game Over", f"Player {player} wins!")
+        elif self.game.is_over:
             self.status_label.config(text="It's a draw! 🤝", fg="orange")
             messagebox.showinfo("Game Over", "It's a draw!")
         else:
-            # Switch players
-            self.current_player = "O" if self.current_player == "X" else "X"
             self.status_label.config(
-                text=f"Player {self.current_player}'s turn",
+                text=f"Player {self.game.current_player}'s turn",
                 fg="green"
             )
     
-    def check_winner(self, player):
-        # Check rows
-        for row in range(3):
-            if all(self.board[row][col] == player for col in range(3)):
-                return True
-        
-        # Check columns
-        for col in range(3):
-            if all(self.board[row][col] == player for row in range(3)):
-                return True
-        
-        # Check diagonals
-        if all(self.board[i][i] == player for i in range(3)):
-            return True
-        if all(self.board[i][2-i] == player for i in range(3)):
-            return True
-            
-        return False
+    def is_ai_turn(self):
+        return (self.ai_difficulty is not None and not self.game.is_over
+                and self.game.current_player == self.ai_side)
+    
+    def start_ai_turn(self):
+        """Send the position to the AI worker if it is the AI's move"""
+        if not self.is_ai_turn():
+            return
+        self.search_id += 1
+        self.ai.submit(self.search_id, self.ai_difficulty, self.game.to_list(),
+                       self.game.current_player, self.k)
+        self.status_label.config(text="AI is thinking...", fg="gray")
+        self.poll_job = self.window.after(POLL_MS, self.poll_ai)
     
-    def is_draw(self):
-        return all(self.board[row][col] != " " for row in range(3) for col in range(3))
+    def poll_ai(self):
+        self.poll_job = None
+        result = self.ai.poll()
+        if result is None:
+            self.poll_job = self.window.after(POLL_MS, self.poll_ai)
+            return
+        search_id, position, error = result
+        if search_id != self.search_id:
+            self.poll_job = self.window.after(POLL_MS, self.poll_ai)
+            return
+        if error is not None:
+            self.status_label.config(text="The AI failed to move", fg="red")
+            messagebox.showinfo("AI Error", error)
+            return
+        self.play(position)
     
-    def disable_all_buttons(self):
-        for row in range(3):
-            for col in range(3):
-                self.buttons[row][col].config(state="disabled")
+    def cancel_ai(self):
+        self.ai.cancel()
+        if self.poll_job is not None:
+            self.window.after_cancel(self.poll_job)
+            self.poll_job = None
     
     def new_game(self):
+        # Stop any search for the old game and pick up the chosen opponent
+        self.cancel_ai()
+        opponent = self.opponent.get()
+        self.ai_difficulty = None if opponent == HUMAN else opponent
+        
         # Reset game state
-        self.current_player = "X"
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
-        self.game_over = False
+        self.game.reset()
         
-        # Reset UI
-        for row in range(3):
-            for col in range(3):
-                self.buttons[row][col].config(
-                    text=" ",
-                    state="normal",
-                    bg="lightgray"
-                )
+        # Reset UI: every mark goes in one canvas operation
+        self.canvas.delete("mark")
         
         self.status_label.config(
-            text=f"Player {self.current_player}'s turn",
+            text=f"Player {self.game.current_player}'s turn",
             fg="green"
         )
+        self.start_ai_turn()
+    
+    def quit(self):
+        self.cancel_ai()
+        self.ai.close()
+        self.window.quit()
     
     def run(self):
         self.window.mainloop()
 
 if __name__ == "__main__":
-    game = TicTacToeGUI()
+    import argparse
+    parser = argparse.ArgumentParser(description="Tic Tac Toe GUI")
+    parser.add_argument("--rows", type=int, default=3, help="board rows")
+    parser.add_argument("--cols", type=int, default=3, help="board columns")
+    parser.add_argument("-k", type=int, default=None, help="marks in a row needed to win")
+    parser.add_argument("--ai", choices=sorted(strategies.STRATEGIES), default=None,
+                        help="play against this AI (default: two players)")
+    parser.add_argument("--ai-side", choices=("X", "O"), default="O", help="side the AI plays")
+    args = parser.parse_args()
+    game = TicTacToeGUI(args.rows, args.cols, args.k, args.ai or HUMAN, args.ai_side)
     game.run()
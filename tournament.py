@@ -0,0 +1,182 @@
+"""
+Round-robin tournament between registered strategies with Elo ratings
+
+Every pair of strategies plays the same number of games from both sides.
+Games run in chunks across a process pool and results are reported as
+each chunk finishes.  At the end, Elo ratings are fitted to all results
+by maximum likelihood, with 95% confidence intervals.  This shows whether
+a faster strategy gives up any strength.
+
+    python tournament.py easy medium hard mcts-500 --games 200 --workers 8
+"""
+
+import argparse
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+
+import strategies
+from simulate import ITERATIONS, TIME_BUDGET, run_chunk
+
+# Rating scale and anchor: the average rating of the field
+ELO_SCALE = 400 / math.log(10)
+BASE_RATING = 1500
+
+# Virtual draws added between every pair so ratings stay finite when one
+# side wins every game
+PRIOR_DRAWS = 1.0
+
+MatchResult = namedtuple("MatchResult", ["x_name", "o_name", "games", "x_wins", "o_wins", "draws"])
+Rating = namedtuple("Rating", ["name", "rating", "interval", "games", "score"])
+
+
+def _play_match(x_name, o_name, games, seed, rows, cols, k, time_budget, iterations):
+    result = run_chunk(x_name, o_name, games, seed, rows, cols, k, None, time_budget, iterations)
+    return MatchResult(x_name, o_name, result.games, result.x_wins, result.o_wins, result.draws)
+
+
+def schedule(names, games, chunk_size):
+    """Yield (x_name, o_name, games) tasks: every pair, both sides, in chunks"""
+    for first, second in combinations(names, 2):
+        for x_name, o_name in ((first, second), (second, first)):
+            remaining = games
+            while remaining > 0:
+                size = min(chunk_size, remaining)
+                yield x_name, o_name, size
+                remaining -= size
+
+
+def stream_tournament(names, games=100, workers=None, chunk_size=50, seed=0,
+                      rows=3, cols=3, k=None, time_budget=TIME_BUDGET, iterations=ITERATIONS):
+    """Play the tournament and yield MatchResults as chunks finish
+
+    games is per pairing and per side, so each pair plays 2 * games.
+    time_budget and iterations limit each search move (see simulate.py).
+    """
+    for name in names:
+        strategies.get_strategy(name)  # Fail fast on unknown names
+    tasks = [
+        (x_name, o_name, size, seed + number, rows, cols, k, time_budget, iterations)
+        for number, (x_name, o_name, size) in enumerate(schedule(names, games, chunk_size))
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield _play_match(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_play_match, *task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _pair_totals(results):
+    """Sum results into {(a, b): [a_score, games]} with a < b"""
+    totals = {}
+    for result in results:
+        a, b = sorted((result.x_name, result.o_name))
+        a_wins = result.x_wins if result.x_name == a else result.o_wins
+        entry = totals.setdefault((a, b), [0.0, 0])
+        entry[0] += a_wins + 0.5 * result.draws
+        entry[1] += result.games
+    return totals
+
+
+def elo_ratings(results, iterations=200):
+    """Fit Elo ratings to match results by maximum likelihood
+
+    Returns Ratings sorted from strongest to weakest.  Each interval is a
+    95% confidence half-width derived from the Fisher information.
+    """
+    totals = _pair_totals(results)
+    names = sorted({name for pair in totals for name in pair})
+    index = {name: number for number, name in enumerate(names)}
+    pairs = [
+        (index[a], index[b], score + PRIOR_DRAWS / 2, games + PRIOR_DRAWS)
+        for (a, b), (score, games) in totals.items()
+    ]
+    ratings = [0.0] * len(names)
+
+    def expected(i, j):
+        return 1.0 / (1.0 + math.exp((ratings[j] - ratings[i]) / ELO_SCALE))
+
+    # Newton iterations on each rating in turn
+    for _ in range(iterations):
+        largest_step = 0.0
+        for player in range(len(names)):
+            gradient = information = 0.0
+            for i, j, score, games in pairs:
+                if player == i:
+                    p = expected(i, j)
+                    gradient += score - games * p
+                elif player == j:
+                    p = expected(j, i)
+                    gradient += (games - score) - games * p
+                else:
+                    continue
+                information += games * p * (1 - p)
+            if information:
+                step = ELO_SCALE * gradient / information
+                ratings[player] += step
+                largest_step = max(largest_step, abs(step))
+        if largest_step < 1e-6:
+            break
+
+    mean = sum(ratings) / len(ratings) if ratings else 0.0
+    summary = []
+    for player, name in enumerate(names):
+        information = games_played = score = 0.0
+        for i, j, pair_score, games in pairs:
+            if player in (i, j):
+                p = expected(i, j)
+                information += games * p * (1 - p)
+                real_games = games - PRIOR_DRAWS
+                real_score = pair_score - PRIOR_DRAWS / 2
+                games_played += real_games
+                score += real_score if player == i else real_games - real_score
+        interval = 1.96 * ELO_SCALE / math.sqrt(information) if information else float("inf")
+        summary.append(Rating(name, BASE_RATING + ratings[player] - mean, interval,
+                              int(games_played), score))
+    summary.sort(key=lambda rating: rating.rating, reverse=True)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-robin tournament between AI strategies")
+    parser.add_argument("strategies", nargs="*", default=["easy", "medium", "hard", "mcts-500"],
+                        help=f"strategy names (registered: {', '.join(sorted(strategies.STRATEGIES))})")
+    parser.add_argument("--games", type=int, default=100, help="games per pairing and side")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="games per worker task")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--rows", type=int, default=3, help="board rows")
+    parser.add_argument("--cols", type=int, default=3, help="board columns")
+    parser.add_argument("-k", type=int, default=None, help="marks in a row needed to win")
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET,
+                        help="seconds per move for time-limited searches")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS,
+                        help="MCTS iterations per move")
+    args = parser.parse_args(argv)
+    if len(args.strategies) < 2:
+        parser.error("need at least two strategies")
+
+    start = time.perf_counter()
+    results = []
+    for result in stream_tournament(args.strategies, args.games, args.workers, args.chunk_size,
+                                    args.seed, args.rows, args.cols, args.k,
+                                    args.time_budget, args.iterations):
+        results.append(result)
+        print(f"{result.x_name:>10} (X) vs {result.o_name:<10} (O): "
+              f"+{result.x_wins} ={result.draws} -{result.o_wins}")
+    print(f"\nPlayed {sum(r.games for r in results)} games in {time.perf_counter() - start:.1f}s\n")
+    print(f"{'Strategy':<12}{'Elo':>8}{'95% CI':>10}{'Games':>8}{'Score':>8}")
+    for rating in elo_ratings(results):
+        print(f"{rating.name:<12}{rating.rating:>8.0f}{'±' + format(rating.interval, '.0f'):>10}"
+              f"{rating.games:>8}{rating.score / rating.games * 100 if rating.games else 0:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()